@@ -0,0 +1,46 @@
+"""Measure the events/sec of AsyncRuntime with thousands of concurrent keys.
+
+Run with: python -m benchmarks.aio_benchmark
+"""
+import asyncio
+import time
+
+from benchmarks.common import random_events, turnstile
+from pyautomaton.aio import AsyncRuntime
+
+N_KEYS = 10_000
+EVENTS_PER_KEY = 50
+
+
+async def _producer(runtime, key, events):
+    for event in events:
+        await runtime.submit(key, event)
+
+
+async def _run(handler, maxsize):
+    fsm = turnstile()
+    runtime = AsyncRuntime(fsm.define(), handler=handler, maxsize=maxsize)
+    events = random_events(fsm, EVENTS_PER_KEY)
+    start = time.perf_counter()
+    await asyncio.gather(*[_producer(runtime, key, events) for key in range(N_KEYS)])
+    await runtime.join()
+    return N_KEYS * EVENTS_PER_KEY / (time.perf_counter() - start)
+
+
+async def _async_handler(key, action):
+    await asyncio.sleep(0)
+    return action
+
+
+def main():
+    for label, handler, maxsize in (
+        ("no handler", None, 0),
+        ("no handler, maxsize=8", None, 8),
+        ("coroutine handler, maxsize=8", _async_handler, 8),
+    ):
+        rate = asyncio.run(_run(handler, maxsize))
+        print(f"{N_KEYS} keys, {label:<30} {rate:>12,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
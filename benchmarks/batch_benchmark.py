@@ -0,0 +1,33 @@
+"""Compare stepping a fleet of machines one by one against the vectorized BatchStepper.
+
+Run with: python -m benchmarks.batch_benchmark (requires numpy)
+"""
+import numpy as np
+
+from benchmarks.common import best_of, ring
+from pyautomaton.vectorized import BatchStepper
+
+FLEET = 1_000_000
+
+
+def main():
+    fsm = ring(1000, 4)
+    compiled = fsm.compile()
+    stepper = BatchStepper(compiled.table)
+    rnd = np.random.default_rng(42)
+    states = rnd.integers(0, stepper.table.n_states, FLEET)
+    events = rnd.integers(0, stepper.table.n_events, FLEET)
+
+    def one_by_one():
+        for state, event in zip(states.tolist(), events.tolist()):
+            compiled._current = state
+            compiled.step(event)
+
+    scalar = best_of(one_by_one, repeat=3)
+    batch = best_of(lambda: stepper.step(states, events))
+    print(f"CompiledAutomaton.step loop {FLEET / scalar:>16,.0f} machines/s")
+    print(f"BatchStepper.step           {FLEET / batch:>16,.0f} machines/s  x{scalar / batch:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Compare feeding bytes one by one to Automaton.__call__ against ByteRecognizer.
+
+Run with: python -m benchmarks.bytescan_benchmark
+"""
+import random
+
+from benchmarks.common import best_of
+from pyautomaton.automaton import Automaton
+from pyautomaton.bytescan import ByteRecognizer
+
+SIZE = 2_000_000
+
+
+def words() -> Automaton:
+    """Return a recognizer splitting ascii text in words and separators."""
+    fsm = Automaton().start_from("separator")
+    for value in range(256):
+        target = "word" if chr(value).isalnum() else "separator"
+        fsm.coming_from("separator").go_in(target).when(value)
+        fsm.coming_from("word").go_in(target).when(value)
+    return fsm
+
+
+def main():
+    rnd = random.Random(42)
+    data = bytes(rnd.choice(b"abcdefghij   ,.") for _ in range(SIZE))
+    fsm = words()
+    recognizer = ByteRecognizer(fsm)
+
+    def one_by_one():
+        for value in data:
+            fsm(value)
+
+    baseline = best_of(one_by_one, repeat=3)
+    for label, fn in (
+        ("Automaton.__call__", one_by_one),
+        ("ByteRecognizer.final_state", lambda: recognizer.final_state(data)),
+        ("ByteRecognizer.scan visits", lambda: recognizer.scan(data, count_visits=True)),
+    ):
+        elapsed = best_of(fn, repeat=3)
+        print(f"{label:<28} {SIZE / elapsed / 1e6:>8.1f} MB/s  x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
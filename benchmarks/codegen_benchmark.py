@@ -0,0 +1,46 @@
+"""Compare Automaton.__call__, CompiledAutomaton and the generated stepper on a random stream of events, and
+measure the cost of executing a large generated module and of creating steppers from it.
+
+Run with: python -m benchmarks.codegen_benchmark
+"""
+import time
+
+from benchmarks.common import best_of, random_events, ring
+from pyautomaton.codegen import compile_stepper, generate_source
+
+EVENTS = 200_000
+
+
+def main():
+    for n_states in (10, 1000):
+        fsm = ring(n_states, n_events=4)
+        events = random_events(fsm, EVENTS)
+        compiled = fsm.compile()
+        stepper = compile_stepper(fsm)
+
+        def run(step):
+            for event in events:
+                step(event)
+
+        baseline = best_of(lambda: run(fsm))
+        for label, step in (
+            ("Automaton.__call__", fsm),
+            ("CompiledAutomaton", compiled),
+            ("generated stepper", stepper),
+        ):
+            elapsed = best_of(lambda: run(step))
+            rate = EVENTS / elapsed / 1e6
+            print(f"{n_states:>5} states {label:<20} {rate:>6.2f} M events/s  x{baseline / elapsed:.1f}")
+
+    n_states = 50_000
+    code = compile(generate_source(ring(n_states, n_events=4)), "<stepper>", "exec")
+    namespace = {}
+    start = time.perf_counter()
+    exec(code, namespace)
+    print(f"{n_states} states module execution   {time.perf_counter() - start:.3f} s")
+    elapsed = best_of(namespace["new_stepper"])
+    print(f"{n_states} states new_stepper        {elapsed * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Shared helpers for the benchmark scripts."""
+import random
+import time
+from typing import Callable, List
+
+from pyautomaton.automaton import Automaton
+
+
+def turnstile() -> Automaton:
+    """Return the turnstile automaton shown in the README."""
+    return (
+        Automaton()
+        .start_from("locked")
+        .go_in("locked")
+        .when("push")
+        .coming_from("locked")
+        .go_in("unlocked")
+        .doing("unlock")
+        .when("coin")
+        .coming_from("unlocked")
+        .go_in("unlocked")
+        .when("coin")
+        .coming_from("unlocked")
+        .go_in("locked")
+        .doing("lock")
+        .when("push")
+    )
+
+
+def ring(n_states: int, n_events: int = 2) -> Automaton:
+    """Return an automaton with n_states states in which event e{j} moves from state s{i} to s{(i + j + 1) % n_states}."""
+    fsm = Automaton().start_from("s0")
+    for i in range(n_states):
+        fsm.coming_from(f"s{i}")
+        for j in range(n_events):
+            fsm.go_in(f"s{(i + j + 1) % n_states}").doing(f"a{j}").when(f"e{j}")
+    return fsm
+
+
+def random_events(automaton: Automaton, n: int, seed: int = 42) -> List:
+    """Return n events accepted by the automaton, starting from its initial state."""
+    rnd = random.Random(seed)
+    state = automaton.get_initial_state()
+    events = []
+    for _ in range(n):
+        event = rnd.choice(list(state.transitions))
+        events.append(event)
+        state = state.transitions[event].target
+    return events
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Return the best wall clock time in seconds of repeat invocations of fn."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,31 @@
+"""Compare events/sec of Automaton.__call__ against the compiled automaton.
+
+Run with: python -m benchmarks.compile_benchmark
+"""
+from benchmarks.common import best_of, random_events, ring, turnstile
+
+N_EVENTS = 200_000
+
+
+def _drive(step, events):
+    for event in events:
+        step(event)
+
+
+def main():
+    for label, fsm in (("turnstile", turnstile()), ("ring-1000", ring(1000, 4))):
+        events = random_events(fsm, N_EVENTS)
+        compiled = fsm.compile()
+        event_ids = [compiled.table.event_ids[e] for e in events]
+        results = {
+            "Automaton.__call__": best_of(lambda: _drive(fsm, events)),
+            "CompiledAutomaton.__call__": best_of(lambda: _drive(compiled, events)),
+            "CompiledAutomaton.step": best_of(lambda: _drive(compiled.step, event_ids)),
+        }
+        baseline = results["Automaton.__call__"]
+        for name, elapsed in results.items():
+            print(f"{label:<10} {name:<28} {N_EVENTS / elapsed:>14,.0f} events/s  x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Measure the cost of transition listeners on Automaton.__call__.
+
+The disabled path is the one of automata without listeners, compare it with previous commits through
+python -m benchmarks.suite --baseline.
+
+Run with: python -m benchmarks.hooks_benchmark
+"""
+from benchmarks.common import best_of, random_events, ring
+from pyautomaton.automaton import TransitionListener
+from pyautomaton.metrics import MetricsCollector
+
+N_EVENTS = 200_000
+
+
+def _drive(fsm, events):
+    for event in events:
+        fsm(event)
+
+
+def main():
+    never_observed = ring(1000, 4)
+    events = random_events(never_observed, N_EVENTS)
+    no_longer_observed = ring(1000, 4)
+    listener = TransitionListener()
+    no_longer_observed.add_listener(listener).remove_listener(listener)
+    no_op_listener = ring(1000, 4).add_listener(TransitionListener())
+    metrics = ring(1000, 4).add_listener(MetricsCollector())
+
+    baseline = best_of(lambda: _drive(never_observed, events), repeat=9)
+    for label, fsm in (
+        ("no listeners", never_observed),
+        ("listener removed", no_longer_observed),
+        ("no-op listener", no_op_listener),
+        ("MetricsCollector", metrics),
+    ):
+        elapsed = best_of(lambda: _drive(fsm, events), repeat=9)
+        print(f"{label:<18} {N_EVENTS / elapsed:>14,.0f} events/s  overhead {elapsed / baseline - 1:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Measure append and recovery throughput of TransitionJournal.
+
+Run with: python -m benchmarks.journal_benchmark
+"""
+import random
+import tempfile
+import time
+
+from benchmarks.common import ring
+from pyautomaton.journal import TransitionJournal
+
+N_RECORDS = 1_000_000
+N_INSTANCES = 10_000
+
+
+def main():
+    definition = ring(100, 4).define()
+    rnd = random.Random(42)
+    events = definition.table.events
+    records = [(f"instance-{rnd.randrange(N_INSTANCES)}", rnd.choice(events)) for _ in range(N_RECORDS)]
+    with tempfile.TemporaryDirectory() as directory:
+        with TransitionJournal(directory, definition, fsync_every=10_000) as journal:
+            start = time.perf_counter()
+            for instance_id, event in records:
+                journal.append(instance_id, event)
+            journal.flush()
+            elapsed = time.perf_counter() - start
+            print(f"append  {N_RECORDS / elapsed:>12,.0f} records/s")
+
+            start = time.perf_counter()
+            instances = journal.recover()
+            elapsed = time.perf_counter() - start
+            print(f"recover {N_RECORDS / elapsed:>12,.0f} records/s ({elapsed:.2f}s, {len(instances)} instances)")
+
+            start = time.perf_counter()
+            journal.compact()
+            print(f"compact {time.perf_counter() - start:>12.2f}s")
+
+
+if __name__ == "__main__":
+    main()
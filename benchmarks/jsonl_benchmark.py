@@ -0,0 +1,51 @@
+"""Measure the throughput and peak memory of exporting and importing instances in JSON Lines format.
+
+Run with: python -m benchmarks.jsonl_benchmark
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import ring
+from pyautomaton.jsonl import dump_lines, load_lines
+
+N_INSTANCES = 1_000_000
+
+
+def measure(label: str, fn):
+    """Report the throughput of fn, then its peak allocation on a separate run, as tracing slows fn down."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<24} {N_INSTANCES / elapsed:>12,.0f} instances/s  peak {peak / 1e6:>6.1f} MB")
+
+
+def main():
+    definition = ring(100, 4).define()
+    state_names = definition.table.state_names
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fleet.jsonl")
+
+        def dump():
+            fleet = (definition.new_instance(state_names[i % len(state_names)]) for i in range(N_INSTANCES))
+            with open(path, "w") as f:
+                dump_lines(fleet, f)
+
+        def load(workers):
+            with open(path) as f:
+                for _ in load_lines(f, workers=workers):
+                    pass
+
+        measure("dump_lines", dump)
+        print(f"{'file size':<24} {os.path.getsize(path) / 1e6:>12.1f} MB")
+        for workers in (None, max(2, os.cpu_count())):
+            measure(f"load_lines workers={workers}", lambda: load(workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Measure the memory retained by an Automaton loaded from a dump against the equivalent CompactGraph.
+
+Run with: python -m benchmarks.memory_benchmark
+"""
+import gc
+import time
+import tracemalloc
+
+from benchmarks.common import ring
+from pyautomaton.automaton import Automaton
+from pyautomaton.compact import CompactGraph
+
+SIZES = (10_000, 100_000)
+
+
+def measure(fn):
+    """Return the result of fn, the bytes it retains, its peak allocation and its duration.
+
+    The duration is measured on a separate run, as tracing allocations slows fn down."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main():
+    for n_states in SIZES:
+        dump = Automaton.dump(ring(n_states, n_events=4))
+        print(f"{n_states} states, {4 * n_states} transitions")
+        for label, fn in (
+            ("Automaton.load", lambda: Automaton.load(dump)),
+            ("CompactGraph.load", lambda: CompactGraph.load(dump)),
+        ):
+            result, current, peak, elapsed = measure(fn)
+            print(
+                f"  {label:<18} retained {current / 1e6:>8.1f} MB ({current / n_states:>6.0f} B/state)"
+                f"  peak {peak / 1e6:>8.1f} MB  {elapsed:.2f}s"
+            )
+            del result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare migrating instances through Automaton.dump and Automaton.load against Migration.migrate.
+
+Run with: python -m benchmarks.migration_benchmark
+"""
+import json
+import time
+
+from benchmarks.common import ring
+from pyautomaton.automaton import Automaton
+from pyautomaton.migration import Migration
+from pyautomaton.vectorized import np
+
+N_STATES = 100
+N_INSTANCES = 1_000_000
+N_DUMPS = 2_000
+
+
+def report(label: str, count: int, elapsed: float):
+    print(f"{label:<28} {count / elapsed:>14,.0f} instances/s")
+
+
+def main():
+    old = ring(N_STATES, 4)
+    new = ring(N_STATES, 4)
+    new.version = 2
+    mapping = {f"s{i}": f"s{(i + 1) % N_STATES}" for i in range(N_STATES)}
+
+    start = time.perf_counter()
+    for _ in range(N_DUMPS):
+        dct = json.loads(Automaton.dump(old))
+        dct["current_state"] = mapping[dct["current_state"]]
+        dct["version"] = 2
+        Automaton.load(json.dumps(dct))
+    report("dump, rebuild and load", N_DUMPS, time.perf_counter() - start)
+
+    old_definition, new_definition = old.define(), new.define()
+    state_names = old_definition.table.state_names
+    instances = {i: old_definition.new_instance(state_names[i % N_STATES]) for i in range(N_INSTANCES)}
+    start = time.perf_counter()
+    migration = Migration(old_definition, new_definition, mapping)
+    result = migration.migrate(instances)
+    report("Migration.migrate", result.migrated, time.perf_counter() - start)
+
+    ids = [i % N_STATES for i in range(N_INSTANCES)]
+    start = time.perf_counter()
+    migration.remap_ids(ids)
+    report("Migration.remap_ids list", N_INSTANCES, time.perf_counter() - start)
+    if np is not None:
+        array = np.asarray(ids, dtype=np.intp)
+        start = time.perf_counter()
+        migration.remap_ids(array)
+        report("Migration.remap_ids numpy", N_INSTANCES, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
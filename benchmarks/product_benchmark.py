@@ -0,0 +1,33 @@
+"""Compare stepping several automata side by side against their synchronous product.
+
+Run with: python -m benchmarks.product_benchmark
+"""
+from benchmarks.common import best_of, random_events, ring
+from pyautomaton.product import ProductAutomaton
+
+N_EVENTS = 200_000
+
+
+def main():
+    components = [ring(n, 2) for n in (7, 11, 13)]
+    events = random_events(components[0], N_EVENTS)
+    product = ProductAutomaton(*components)
+    product.explore()
+
+    def side_by_side():
+        for event in events:
+            for component in components:
+                component(event)
+
+    def with_product():
+        for event in events:
+            product(event)
+
+    separate = best_of(side_by_side)
+    combined = best_of(with_product)
+    print(f"{len(components)} x Automaton.__call__   {N_EVENTS / separate:>14,.0f} events/s")
+    print(f"ProductAutomaton.__call__ {N_EVENTS / combined:>14,.0f} events/s  x{separate / combined:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure how the events/sec of ShardedExecutor scale with the number of worker processes.
+
+Stepping the batch in-process is reported as a reference. step partitions the batch and collects the actions in the
+parent process, while step_shards receives shards of integer keys and event ids already partitioned by the caller.
+
+Run with: python -m benchmarks.sharded_benchmark
+"""
+from array import array
+import multiprocessing
+import random
+import time
+
+from benchmarks.common import ring
+from pyautomaton.sharded import ShardedExecutor
+
+N_KEYS = 100_000
+BATCH = 200_000
+ROUNDS = 5
+
+
+def rate(fn) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return BATCH * ROUNDS / (time.perf_counter() - start)
+
+
+def main():
+    definition = ring(100, 4).define()
+    rnd = random.Random(42)
+    events = definition.table.events
+    batch = [(rnd.randrange(N_KEYS), rnd.choice(events)) for _ in range(BATCH)]
+
+    dispatch = definition.table.dispatch
+    initial_state = definition.table.initial_state
+    states = {}
+
+    def in_process():
+        for key, event in batch:
+            _, states[key] = dispatch[states.get(key, initial_state)][event]
+
+    print(f"{'in-process':<24} {rate(in_process):>14,.0f} events/s")
+    workers = 1
+    while workers <= max(2, multiprocessing.cpu_count()):
+        with ShardedExecutor(definition, workers=workers) as executor:
+            shards = [(array("q", keys), event_ids) for keys, event_ids in executor.partition(batch)]
+            step = rate(lambda: executor.step(batch))
+            step_shards = rate(lambda: executor.step_shards(shards))
+        print(f"{workers:>3} workers step        {step:>14,.0f} events/s")
+        print(f"{workers:>3} workers step_shards {step_shards:>14,.0f} events/s")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
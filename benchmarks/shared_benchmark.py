@@ -0,0 +1,55 @@
+"""Compare the startup cost of Automaton.load against mapping a SharedDefinition, and their stepping throughput.
+
+Run with: python -m benchmarks.shared_benchmark
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.common import best_of, random_events, ring
+from pyautomaton.automaton import Automaton
+from pyautomaton.shared import SharedDefinition, share, write
+
+N_STATES = 100_000
+EVENTS = 200_000
+
+
+def main():
+    fsm = ring(N_STATES, n_events=4)
+    dump = Automaton.dump(fsm)
+    events = random_events(fsm, EVENTS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ring.bin")
+        write(fsm, path)
+        print(f"json dump {len(dump) / 1e6:.1f} MB, binary layout {os.path.getsize(path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        loaded = Automaton.load(dump)
+        print(f"Automaton.load                     {time.perf_counter() - start:>8.4f}s")
+        start = time.perf_counter()
+        definition = SharedDefinition.from_file(path)
+        print(f"SharedDefinition.from_file         {time.perf_counter() - start:>8.4f}s")
+        block = share(fsm)
+        try:
+            start = time.perf_counter()
+            attached = SharedDefinition.from_shared_memory(block.name)
+            print(f"SharedDefinition.from_shared_memory {time.perf_counter() - start:>7.4f}s")
+            attached.close()
+        finally:
+            block.close()
+            block.unlink()
+
+        stepper = definition.new_stepper()
+
+        def run(step):
+            for event in events:
+                step(event)
+
+        for label, step in (("Automaton.__call__", loaded), ("SharedStepper", stepper)):
+            elapsed = best_of(lambda: run(step))
+            print(f"{label:<34} {EVENTS / elapsed / 1e6:>8.2f} M events/s")
+        definition.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure insert and load throughput of SQLiteStore against one Automaton.dump row per instance.
+
+Run with: python -m benchmarks.sqlite_benchmark
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.common import ring
+from pyautomaton.automaton import Automaton
+from pyautomaton.sqlite_store import SQLiteStore
+
+N_INSTANCES = 200_000
+N_DUMPS = 5_000
+BATCH = 10_000
+
+
+def report(label: str, count: int, elapsed: float):
+    print(f"{label:<34} {count / elapsed:>12,.0f} instances/s")
+
+
+def main():
+    fsm = ring(100, 4)
+    definition = fsm.define()
+    state_names = definition.table.state_names
+    instances = [
+        (f"instance-{i:08d}", definition.new_instance(state_names[i % len(state_names)])) for i in range(N_INSTANCES)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        connection = sqlite3.connect(os.path.join(directory, "dumps.db"))
+        connection.execute("CREATE TABLE automata (key TEXT PRIMARY KEY, dump TEXT)")
+        start = time.perf_counter()
+        for i in range(N_DUMPS):
+            connection.execute("INSERT INTO automata VALUES (?, ?)", (f"instance-{i:08d}", Automaton.dump(fsm)))
+        connection.commit()
+        report("Automaton.dump rows insert", N_DUMPS, time.perf_counter() - start)
+        start = time.perf_counter()
+        for (dump,) in connection.execute("SELECT dump FROM automata"):
+            Automaton.load(dump)
+        report("Automaton.load rows load", N_DUMPS, time.perf_counter() - start)
+        connection.close()
+
+        with SQLiteStore(os.path.join(directory, "store.db"), cache_size=0) as store:
+            start = time.perf_counter()
+            for offset in range(0, N_INSTANCES, BATCH):
+                store.save_many(instances[offset : offset + BATCH])
+            report("SQLiteStore.save_many", N_INSTANCES, time.perf_counter() - start)
+            start = time.perf_counter()
+            store.save_many((f"automaton-{i:08d}", fsm) for i in range(N_DUMPS))
+            report("SQLiteStore.save_many Automaton", N_DUMPS, time.perf_counter() - start)
+            automata = [Automaton.load(Automaton.dump(fsm)) for _ in range(N_DUMPS // 10)]
+            start = time.perf_counter()
+            store.save_many((f"distinct-{i:08d}", automaton) for i, automaton in enumerate(automata))
+            report("  distinct Automaton objects", len(automata), time.perf_counter() - start)
+            start = time.perf_counter()
+            loaded = 0
+            last = None
+            while True:
+                batch = store.load_range(None if last is None else last + "\0", limit=BATCH)
+                if not batch:
+                    break
+                loaded += len(batch)
+                last = batch[-1][0]
+            report("SQLiteStore.load_range", loaded, time.perf_counter() - start)
+            keys = [key for key, _ in instances[:: N_INSTANCES // N_DUMPS]]
+            start = time.perf_counter()
+            for key in keys:
+                store.get(key)
+            report("SQLiteStore.get", len(keys), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark suite covering construction, stepping, dump, load and equality of automata of growing size.
+
+Run with: python -m benchmarks.suite [--sizes 2 1000 100000] [--output results.json] [--baseline previous.json]
+
+Results are written as JSON, one entry per (machine, benchmark) pair with its ops/sec and the peak memory allocated
+while running it, so that runs on different commits can be compared with --baseline.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import best_of, random_events, ring, turnstile
+from pyautomaton.automaton import Automaton, State
+
+DEFAULT_SIZES = [2, 100, 1_000, 10_000, 100_000]
+EVENTS_PER_STATE = 2
+
+
+def _build(n_states: int) -> Automaton:
+    if n_states == 2:
+        return turnstile()
+    return ring(n_states, EVENTS_PER_STATE)
+
+
+def _peak_memory(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _benchmarks(n_states: int, n_events: int) -> List[Tuple[str, int, Callable[[], object]]]:
+    """Return the (name, operations per run, function) benchmarks for a machine with n_states states."""
+    fsm = _build(n_states)
+    other = _build(n_states)
+    events = random_events(fsm, n_events)
+    fsm.get_current_state()
+    automaton_dump = Automaton.dump(fsm)
+    initial_state = fsm.get_initial_state()
+
+    def call():
+        fsm.set_current_state(initial_state.name)
+        for event in events:
+            fsm(event)
+
+    return [
+        ("build", 1, lambda: _build(n_states)),
+        ("call", n_events, call),
+        ("state_dump", 1, lambda: State.dump(initial_state)),
+        ("automaton_dump", 1, lambda: Automaton.dump(fsm)),
+        ("automaton_load", 1, lambda: Automaton.load(automaton_dump)),
+        ("state_eq", 1, lambda: initial_state == other.get_initial_state()),
+    ]
+
+
+def run(sizes: List[int], n_events: int, repeat: int) -> List[Dict]:
+    results = []
+    for n_states in sizes:
+        fsm = _build(n_states)
+        transitions = sum(len(state) for state in fsm.states.values())
+        machine = "turnstile" if n_states == 2 else f"ring-{n_states}"
+        for name, ops, fn in _benchmarks(n_states, n_events):
+            seconds = best_of(fn, repeat)
+            result = {
+                "machine": machine,
+                "states": len(fsm.states),
+                "transitions": transitions,
+                "benchmark": name,
+                "ops": ops,
+                "seconds": seconds,
+                "ops_per_sec": ops / seconds,
+                "peak_memory_bytes": _peak_memory(fn),
+            }
+            results.append(result)
+            print(
+                f"{machine:<12} {name:<16} {result['ops_per_sec']:>16,.1f} ops/s"
+                f" {result['peak_memory_bytes'] / 1024:>12,.0f} KiB",
+                file=sys.stderr,
+            )
+    return results
+
+
+def _metadata() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform()}
+
+
+def compare(results: List[Dict], baseline: List[Dict]):
+    """Print the ops/sec ratio of each result against the matching baseline result."""
+    previous = {(r["machine"], r["benchmark"]): r for r in baseline}
+    for result in results:
+        before = previous.get((result["machine"], result["benchmark"]))
+        if before is not None:
+            ratio = result["ops_per_sec"] / before["ops_per_sec"]
+            print(f"{result['machine']:<12} {result['benchmark']:<16} x{ratio:.2f}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="number of states of each machine")
+    parser.add_argument("--events", type=int, default=100_000, help="number of events stepped by the call benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each benchmark, the best one is reported")
+    parser.add_argument("--output", help="file to write the results to, standard output if omitted")
+    parser.add_argument("--baseline", help="results of a previous run to compare with")
+    args = parser.parse_args(argv)
+
+    report = {"meta": _metadata(), "results": run(args.sizes, args.events, args.repeat)}
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report["results"], json.load(f)["results"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measure scheduling, cancellation and expiration throughput of TimerScheduler with a million pending timers.
+
+Run with: python -m benchmarks.timers_benchmark
+"""
+import random
+import time
+
+from pyautomaton.timers import TimerScheduler
+
+N_TIMERS = 1_000_000
+
+
+def report(label: str, count: int, elapsed: float):
+    print(f"{label:<28} {count / elapsed:>12,.0f} timers/s")
+
+
+def main():
+    rnd = random.Random(42)
+    delays = [rnd.uniform(0, 3600) for _ in range(N_TIMERS)]
+    now = 0.0
+    scheduler = TimerScheduler(lambda: now)
+
+    start = time.perf_counter()
+    for key, delay in enumerate(delays):
+        scheduler.schedule(key, delay, "expired")
+    report("schedule", N_TIMERS, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for key in range(0, N_TIMERS, 2):
+        scheduler.cancel(key)
+    report("cancel", N_TIMERS // 2, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for key in range(0, N_TIMERS, 4):
+        scheduler.schedule(key, delays[key], "expired")
+    report("reschedule", N_TIMERS // 4, time.perf_counter() - start)
+
+    pending = len(scheduler)
+    start = time.perf_counter()
+    expired = 0
+    for second in range(1, 3601):
+        expired += len(scheduler.expired(float(second)))
+    elapsed = time.perf_counter() - start
+    report(f"expire ({pending} pending)", expired, elapsed)
+    start = time.perf_counter()
+    for _ in range(10_000):
+        scheduler.expired(0.0)
+    print(f"{'empty poll':<28} {(time.perf_counter() - start) / 10_000 * 1e6:>12.2f} us")
+
+
+if __name__ == "__main__":
+    main()
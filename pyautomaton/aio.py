@@ -0,0 +1,149 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Union
+
+import asyncio
+import inspect
+
+from pyautomaton.definition import AutomatonDefinition, AutomatonInstance
+
+Handler = Callable[[Hashable, Any], Union[Any, Awaitable]]
+
+
+class _Slot:
+    """Instance and pending events of a single entity key."""
+
+    __slots__ = ("instance", "queue", "worker")
+
+    def __init__(self, instance: AutomatonInstance, maxsize: int) -> None:
+        self.instance = instance
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.worker: Optional[asyncio.Task] = None
+
+    def has_worker(self) -> bool:
+        """Returns true if a worker is running, or about to run, for the events of the key."""
+        return self.worker is not None and not self.worker.done()
+
+    def worker_done(self, worker: asyncio.Task):
+        """Callback of the worker tasks, failing the queued events of a worker cancelled before its first step."""
+        if self.worker is worker:
+            self.worker = None
+            while not self.queue.empty():
+                self.queue.get_nowait()[1].cancel()
+
+
+class AsyncRuntime:
+    """
+    Drive the instances of a shared definition from asyncio code, one instance per entity key.
+
+    Events sent for the same key are processed one at a time, in the order in which they have been sent, while
+    events of different keys are processed concurrently. Each key has a queue of pending events holding at most
+    maxsize events (unbounded if maxsize is 0): senders wait while the queue of their key is full.
+
+    When a handler is given, it is invoked with the key and the action of each executed transition, and its result,
+    awaited if it is awaitable, is returned to the sender in place of the action. The next event of the same key is
+    processed only once the handler has completed.
+
+    If the worker of a key is cancelled, e.g. when the event loop shuts down, the futures of its in-flight and queued
+    events are cancelled, so that no sender waits forever. Instances stay bound to their key until evicted with
+    evict_idle, which returns them so that they can be saved and later bound again with add.
+    """
+
+    def __init__(self, definition: AutomatonDefinition, handler: Optional[Handler] = None, maxsize: int = 0) -> None:
+        self.definition = definition
+        self.handler = handler
+        self.maxsize = maxsize
+        self._slots: Dict[Hashable, _Slot] = {}
+
+    def _slot(self, key: Hashable) -> _Slot:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _Slot(self.definition.new_instance(), self.maxsize)
+        return slot
+
+    def add(self, key: Hashable, instance: AutomatonInstance):
+        """Bind the instance to the key, raising ValueError if the key has events pending."""
+        slot = self._slots.get(key)
+        if slot is not None and (slot.has_worker() or not slot.queue.empty()):
+            raise ValueError(f"Key {key!r} has pending events")
+        self._slots[key] = _Slot(instance, self.maxsize)
+
+    def evict_idle(
+        self, predicate: Optional[Callable[[Hashable, AutomatonInstance], bool]] = None
+    ) -> Dict[Hashable, AutomatonInstance]:
+        """Unbind the keys with no pending events, only the ones satisfying the predicate if given, and return them
+        mapped to their instance."""
+        evicted = {
+            key: slot.instance
+            for key, slot in self._slots.items()
+            if not slot.has_worker() and slot.queue.empty() and (predicate is None or predicate(key, slot.instance))
+        }
+        for key in evicted:
+            del self._slots[key]
+        return evicted
+
+    def instance(self, key: Hashable) -> AutomatonInstance:
+        """Return the instance bound to the key, creating it in the initial state if needed."""
+        return self._slot(key).instance
+
+    def __contains__(self, key):
+        """Returns true if an instance is bound to the key."""
+        return key in self._slots
+
+    def __len__(self):
+        """Return the number of keys bound to an instance."""
+        return len(self._slots)
+
+    async def submit(self, key: Hashable, event) -> asyncio.Future:
+        """Enqueue the event for the key, waiting while its queue is full.
+
+        Return a future resolved with the action, or the handler result, once the event has been processed. The
+        future holds the IllegalEventError raised if the event is not allowed in the current state of the instance.
+        """
+        slot = self._slot(key)
+        future = asyncio.get_running_loop().create_future()
+        await slot.queue.put((event, future))
+        if not slot.has_worker():
+            slot.worker = asyncio.ensure_future(self._drain(key, slot))
+            slot.worker.add_done_callback(slot.worker_done)
+        return future
+
+    async def send(self, key: Hashable, event):
+        """Enqueue the event for the key and return the action, or the handler result, once it has been processed."""
+        return await (await self.submit(key, event))
+
+    async def join(self):
+        """Wait until the events enqueued so far for all the keys have been processed."""
+        while True:
+            workers = [slot.worker for slot in self._slots.values() if slot.has_worker()]
+            if not workers:
+                return
+            # Unlike gather, wait does not cancel the workers when join is cancelled.
+            await asyncio.wait(workers)
+
+    async def _drain(self, key: Hashable, slot: _Slot):
+        queue = slot.queue
+        instance = slot.instance
+        handler = self.handler
+        future = None
+        try:
+            while not queue.empty():
+                event, future = queue.get_nowait()
+                try:
+                    result = instance(event)
+                    if handler is not None:
+                        result = handler(key, result)
+                        if inspect.isawaitable(result):
+                            result = await result
+                except Exception as error:
+                    if not future.done():
+                        future.set_exception(error)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        except asyncio.CancelledError:
+            if future is not None:
+                future.cancel()
+            while not queue.empty():
+                queue.get_nowait()[1].cancel()
+            raise
+        finally:
+            slot.worker = None
@@ -1,13 +1,27 @@
-from typing import TypeVar, Set, Tuple, Dict, Optional, List
+from typing import TypeVar, Tuple, Dict, Optional, List, Iterable, Iterator, Union
 from collections.abc import Mapping
 from collections import namedtuple
 
 import json
+import sys
 
 TState = TypeVar("TState", bound="State")
 TAutomaton = TypeVar("TAutomaton", bound="Automaton")
 
 ActionTargetTuple = namedtuple("ActionTargetTuple", "action target")
+TimeoutTuple = namedtuple("TimeoutTuple", "seconds event")
+
+# Stands for the unhashable actions in structural hashes, so that equal actions always hash the same.
+_UNHASHABLE = object()
+
+
+def _hashable_action(action):
+    """Return the action if it is hashable, or the placeholder of the unhashable actions otherwise."""
+    try:
+        hash(action)
+    except TypeError:
+        return _UNHASHABLE
+    return action
 
 
 class MissingStateDeclarationError(Exception):
@@ -21,12 +35,29 @@ class MissingStateDeclarationError(Exception):
 
 
 class IllegalEventError(Exception):
-    """This error is thrown when an event is issued in a state in which it is not allowed."""
+    """This error is thrown when an event is issued in a state in which it is not allowed.
 
-    def __init__(self, state, event):
-        Exception.__init__(self, f"Event {event} not supported in state {state}")
+    When the event comes from a stream of events, position is the index of the event in the stream."""
+
+    def __init__(self, state, event, position=None):
+        message = f"Event {event} not supported in state {state}"
+        if position is not None:
+            message += f" at position {position}"
+        Exception.__init__(self, message)
         self.state = state
         self.event = event
+        self.position = position
+
+    def __reduce__(self):
+        return IllegalEventError, (self.state, self.event, self.position)
+
+
+class FrozenConfigurationError(Exception):
+    """This error is thrown when trying to change the configuration of a frozen state or automaton."""
+
+    def __init__(self, name):
+        Exception.__init__(self, f"{name} is frozen and its configuration cannot be changed")
+        self.name = name
 
 
 class State(Mapping):
@@ -36,8 +67,12 @@ class State(Mapping):
      - transition matrix, in which for each event is specified if a transition will occur and the next corresponding
      state
      - actions to be performed for each event occurring in the current state
+
+    States have no instance dict. The fields used by the configuration API are cleared when the state is frozen.
     """
 
+    __slots__ = ("name", "transitions", "_event", "_action", "_target", "_frozen", "_hash")
+
     def __init__(
         self,
         name,
@@ -47,6 +82,8 @@ class State(Mapping):
         self._event = None
         self._action = None
         self._target = None
+        self._frozen = False
+        self._hash = None
 
     def _reset(self):
         self._event = None
@@ -57,6 +94,8 @@ class State(Mapping):
         """
         specify the event triggering the transition
         """
+        if self._frozen:
+            raise FrozenConfigurationError(self.name)
         self._event = event
         clear = False
         if self._action:
@@ -71,6 +110,8 @@ class State(Mapping):
 
     def do(self, action) -> TState:
         """Define the action associated with the transition."""
+        if self._frozen:
+            raise FrozenConfigurationError(self.name)
         if not self._event:
             self._action = action
             return self
@@ -85,6 +126,8 @@ class State(Mapping):
 
     def go_in(self, target: TState) -> TState:
         """Define the state to go in when the transition will occur."""
+        if self._frozen:
+            raise FrozenConfigurationError(self.name)
         if not self._event:
             self._target = target
             return self
@@ -124,46 +167,108 @@ class State(Mapping):
         """Return the number of events defined over this state."""
         return len(self.transitions)
 
+    def _reachable(self) -> List[TState]:
+        """Return the states of the subgraph starting from this state, in breadth first order."""
+        reachable = [self]
+        visited = {self.name}
+        for state in reachable:
+            for action_target in state.transitions.values():
+                if action_target.target.name not in visited:
+                    visited.add(action_target.target.name)
+                    reachable.append(action_target.target)
+        return reachable
+
+    def freeze(self) -> TState:
+        """Freeze the state and all the subgraph made by the possible transitions starting from this state.
+
+        The configuration of a frozen state cannot be changed anymore, while frozen states can be hashed. The walk
+        stops at the states already frozen, whose subgraphs are frozen as well, so that freezing all the states of a
+        graph one by one visits each state once."""
+        stack = [self]
+        while stack:
+            state = stack.pop()
+            if state._frozen:
+                continue
+            state._frozen = True
+            state._reset()
+            stack.extend(action_target.target for action_target in state.transitions.values())
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        """Return true if the state has been frozen."""
+        return self._frozen
+
+    def structural_hash(self) -> int:
+        """Return a hash of the subgraph starting from this state, independent of the order of its transitions.
+
+        The hash is cached once the state is frozen."""
+        if self._hash is not None:
+            return self._hash
+        rows = frozenset(
+            (state.name, event, _hashable_action(action_target.action), action_target.target.name)
+            for state in self._reachable()
+            for event, action_target in state.transitions.items()
+        )
+        structural_hash = hash((self.name, rows))
+        if self._frozen:
+            self._hash = structural_hash
+        return structural_hash
+
+    def __hash__(self):
+        """Return the structural hash of the state. Only frozen states can be hashed."""
+        if not self._frozen:
+            raise TypeError(f"unhashable type: 'State', {self.name} is not frozen")
+        return self.structural_hash()
+
     def __eq__(self, o):
-        """Compare the state and all the subgraph made by the possible transitions starting from this state."""
-        def _eq(state_a, state_b, visited):
-            if not isinstance(state_b, State):
-                return False
-            if state_a.name == state_b.name and state_a.name in visited:
-                return True
-            if state_a.name != state_b.name:
+        """Compare the state and all the subgraph made by the possible transitions starting from this state.
+
+        When both the states are frozen, their structural hashes are compared first."""
+        if not isinstance(o, State):
+            return False
+        if self is o:
+            return True
+        if self._frozen and o._frozen and self.structural_hash() != o.structural_hash():
+            return False
+        visited = set()
+        stack = [(self, o)]
+        while stack:
+            state_a, state_b = stack.pop()
+            if not isinstance(state_b, State) or state_a.name != state_b.name:
                 return False
-            if set(state_a.transitions.keys()) != set(state_b.transitions.keys()):
+            if state_a.name in visited:
+                continue
+            if state_a.transitions.keys() != state_b.transitions.keys():
                 return False
             visited.add(state_a.name)
             for k, v in state_a.transitions.items():
-                if v.action != state_b.transitions[k].action or not _eq(
-                    v.target, state_b.transitions[k].target, visited
-                ):
+                other = state_b.transitions[k]
+                if v.action != other.action:
                     return False
-            return True
-
-        return _eq(self, o, set())
+                stack.append((v.target, other.target))
+        return True
 
     def __dict__(self):
-        def _dump(current: State, visited: Set[str]) -> List[Tuple]:
-            if current.name in visited:
-                return []
-            nodes = []
-            visited.add(current.name)
-            for event, action_target_tuple in current.transitions.items():
-                nodes.append(
-                    (
-                        current.name,
-                        event,
-                        action_target_tuple.action,
-                        action_target_tuple.target.name,
-                    )
-                )
-                nodes = nodes + _dump(action_target_tuple.target, visited)
-            return nodes
-
-        return _dump(self, set())
+        """Return the list of (state, event, action, target state) rows of the subgraph starting from this state.
+
+        The rows are listed in depth first order and the graph is walked iteratively, so that its size is not bound
+        by the recursion limit."""
+        nodes = []
+        visited = {self.name}
+        stack = [(self.name, iter(self.transitions.items()))]
+        while stack:
+            name, transitions = stack[-1]
+            for event, action_target_tuple in transitions:
+                target = action_target_tuple.target
+                nodes.append((name, event, action_target_tuple.action, target.name))
+                if target.name not in visited:
+                    visited.add(target.name)
+                    stack.append((target.name, iter(target.transitions.items())))
+                    break
+            else:
+                stack.pop()
+        return nodes
 
     @staticmethod
     def dump(state: TState) -> str:
@@ -173,22 +278,48 @@ class State(Mapping):
     @staticmethod
     def load(states_dump: str):
         """Return a State object starting from a string dump of the state in json."""
-        states_list = json.loads(states_dump)
-        this = None
         states = {}
-        for name, event, action, target in states_list:
-            if name not in states:
-                states[name] = State(name)
-            if target not in states:
-                states[target] = State(target)
-            curr = states[name]
-            curr.do(action)
-            if name != target:
-                curr.go_in(states[target])
-            curr.when(event)
-            if this is None:
-                this = curr
-        return this
+        return _load_rows(json.loads(states_dump), states)
+
+
+def _intern(value):
+    """Return the interned copy of a string, so that the events and actions repeated in a dump are stored once."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _load_rows(rows, states: Dict[str, State]) -> Optional[State]:
+    """Add to states the transitions described by the (state, event, action, target state) rows of a dump.
+
+    Return the source state of the first row, if any."""
+    first = None
+    for name, event, action, target in rows:
+        event = _intern(event)
+        action = _intern(action)
+        source = states.get(name)
+        if source is None:
+            source = states[name] = State(name)
+        target_state = states.get(target)
+        if target_state is None:
+            target_state = states[target] = State(target)
+        source.transitions[event] = ActionTargetTuple(action, target_state)
+        if first is None:
+            first = source
+    return first
+
+
+class TransitionListener:
+    """Base class of the listeners notified of the transitions executed by an Automaton.
+
+    All the notifications do nothing by default, subclasses override the ones they are interested in."""
+
+    def before_transition(self, automaton, state: State, event):
+        """Notified when the event is received, before checking whether it is allowed in the current state."""
+
+    def after_transition(self, automaton, source: State, event, action, target: State):
+        """Notified after the transition from source to target has been executed."""
+
+    def illegal_event(self, automaton, state: State, event):
+        """Notified when the event is not allowed in the current state, before raising IllegalEventError."""
 
 
 class Automaton:
@@ -198,9 +329,13 @@ class Automaton:
         self._current_state = None
         self._initial_state = None
         self.states = {}
+        self.timeouts: Dict[str, TimeoutTuple] = {}
         self._current_configuring_state: Optional[State] = None
         self.name = name
         self.version = version
+        self._frozen = False
+        self._listeners: List[TransitionListener] = []
+        self._index = None
 
     def start_from(self, state_name: str) -> TAutomaton:
         """Define the initial state."""
@@ -210,13 +345,18 @@ class Automaton:
 
     def go_in(self, state_name: str) -> TAutomaton:
         """Define the target state to go in when a given event occurrs."""
+        if self._frozen:
+            raise FrozenConfigurationError(self.name)
         if state_name not in self.states:
             self.states[state_name] = State(state_name)
         self._current_configuring_state.go_in(self.states[state_name])
+        self._index = None
         return self
 
     def coming_from(self, state_name: str) -> TAutomaton:
         """Define the source state for the following event, action and target state definitions."""
+        if self._frozen:
+            raise FrozenConfigurationError(self.name)
         if state_name not in self.states:
             self.states[state_name] = State(state_name)
         self._current_configuring_state = self.states[state_name]
@@ -227,6 +367,7 @@ class Automaton:
         if self._current_configuring_state is None:
             raise MissingStateDeclarationError()
         self._current_configuring_state.when(event)
+        self._index = None
         return self
 
     def doing(self, action: str) -> TAutomaton:
@@ -234,12 +375,38 @@ class Automaton:
         if self._current_configuring_state is None:
             raise MissingStateDeclarationError()
         self._current_configuring_state.do(action)
+        self._index = None
+        return self
+
+    def timeout(self, seconds: float, event) -> TAutomaton:
+        """Define the event to fire when no event is received for the given number of seconds in the source state.
+
+        The automaton only records the timeout, which is fired by a pyautomaton.timers.TimeoutService."""
+        if self._frozen:
+            raise FrozenConfigurationError(self.name)
+        if self._current_configuring_state is None:
+            raise MissingStateDeclarationError()
+        if seconds <= 0:
+            raise ValueError(f"Timeout must be positive, not {seconds}")
+        self.timeouts[self._current_configuring_state.name] = TimeoutTuple(seconds, event)
         return self
 
     def get_initial_state(self) -> State:
         """Return the initial state of the automaton."""
         return self._initial_state
 
+    @property
+    def index(self):
+        """Return the TransitionIndex answering the routing queries over the states of the automaton.
+
+        The index is built on first use and rebuilt on the first use following a change to the configuration made
+        through the automaton. Changes made directly on its states are not tracked."""
+        if self._index is None:
+            from pyautomaton.index import TransitionIndex
+
+            self._index = TransitionIndex(self.states)
+        return self._index
+
     def get_current_state(self) -> State:
         """Return the current state of the automaton."""
         if self._current_state is None:
@@ -255,6 +422,8 @@ class Automaton:
 
         The action associated with the executed transition is returned and the current state of the automaton is updated.
         """
+        if self._listeners:
+            return self._notify_call(event)
         if self._current_state is None:
             self._current_state = self._initial_state
         if event not in self._current_state:
@@ -263,14 +432,167 @@ class Automaton:
         self._current_state = next_state
         return action
 
+    def run(self, events: Iterable) -> Iterator:
+        """Execute the state transitions binded with each of the given events, lazily yielding the actions.
+
+        The events can be any iterable, including generators, and are consumed one at a time. The current state
+        of the automaton is updated before each action is yielded. An IllegalEventError carrying the position of the
+        offending event is raised as soon as an event is not allowed.
+        """
+        if self._listeners:
+            yield from self._notify_run(events)
+            return
+        state = self.get_current_state()
+        for position, event in enumerate(events):
+            try:
+                action, state = state.transitions[event]
+            except KeyError:
+                raise IllegalEventError(state.name, event, position) from None
+            self._current_state = state
+            yield action
+
+    def feed(self, events: Iterable, count_actions: bool = False) -> Union[State, Tuple[State, int]]:
+        """Execute the state transitions binded with each of the given events, discarding the actions.
+
+        Return the final state or, if count_actions is set, the tuple (final state, number of actions performed).
+        An IllegalEventError carrying the position of the offending event is raised as soon as an event is not
+        allowed, leaving the automaton in the last state reached.
+        """
+        if self._listeners:
+            count = sum(1 for action in self._notify_run(events) if action is not None)
+            return (self.get_current_state(), count) if count_actions else self.get_current_state()
+        state = self.get_current_state()
+        count = 0
+        try:
+            if count_actions:
+                for position, event in enumerate(events):
+                    try:
+                        action, state = state.transitions[event]
+                    except KeyError:
+                        raise IllegalEventError(state.name, event, position) from None
+                    if action is not None:
+                        count += 1
+            else:
+                for position, event in enumerate(events):
+                    try:
+                        state = state.transitions[event].target
+                    except KeyError:
+                        raise IllegalEventError(state.name, event, position) from None
+        finally:
+            self._current_state = state
+        if count_actions:
+            return state, count
+        return state
+
+    def add_listener(self, listener: TransitionListener) -> TAutomaton:
+        """Register a listener to be notified of the transitions executed by the automaton.
+
+        While no listener is registered, the transitions are executed without any notification overhead."""
+        self._listeners.append(listener)
+        return self
+
+    def remove_listener(self, listener: TransitionListener) -> TAutomaton:
+        """Unregister a listener previously registered with add_listener."""
+        self._listeners.remove(listener)
+        return self
+
+    def _notify_call(self, event):
+        """Execute the state transition binded with the given event, notifying the listeners."""
+        state = self.get_current_state()
+        listeners = self._listeners
+        for listener in listeners:
+            listener.before_transition(self, state, event)
+        if event not in state.transitions:
+            for listener in listeners:
+                listener.illegal_event(self, state, event)
+            raise IllegalEventError(state.name, event)
+        action, target = state.transitions[event]
+        self._current_state = target
+        for listener in listeners:
+            listener.after_transition(self, state, event, action, target)
+        return action
+
+    def _notify_run(self, events: Iterable) -> Iterator:
+        """Execute the state transitions binded with each of the given events, notifying the listeners."""
+        for position, event in enumerate(events):
+            try:
+                action = self._notify_call(event)
+            except IllegalEventError as error:
+                raise IllegalEventError(error.state, error.event, position) from None
+            yield action
+
+    def minimize(self) -> TAutomaton:
+        """Return a new automaton behaving as this one, without unreachable states and with equivalent states merged.
+
+        See pyautomaton.minimize.minimize to also get the achieved reduction."""
+        from pyautomaton.minimize import minimize
+
+        return minimize(self).automaton
+
+    def compile(self):
+        """Return a table driven copy of the automaton, starting from its current state.
+
+        The compiled automaton interns states and events into integer ids and performs a single lookup per event.
+        Later changes to the configuration of this automaton are not reflected in the compiled one.
+        """
+        from pyautomaton.compiled import CompiledAutomaton, TransitionTable
+
+        table = TransitionTable.from_automaton(self)
+        return CompiledAutomaton(table, table.state_ids[self.get_current_state().name])
+
+    def generate_source(self) -> str:
+        """Return the source of a Python module implementing the automaton as a specialized stepper function.
+
+        See pyautomaton.codegen to compile it at runtime or write it to disk."""
+        from pyautomaton.codegen import generate_source
+
+        return generate_source(self)
+
+    def compact(self):
+        """Return a memory lean, read only copy of the states of the automaton, as a CompactGraph.
+
+        Later changes to the configuration of this automaton are not reflected in the compact graph."""
+        from pyautomaton.compact import CompactGraph
+
+        return CompactGraph.from_automaton(self)
+
+    def define(self):
+        """Return an immutable definition of the automaton, from which lightweight instances can be created.
+
+        Later changes to the configuration of this automaton are not reflected in the definition.
+        """
+        from pyautomaton.definition import AutomatonDefinition
+
+        return AutomatonDefinition(self)
+
+    def freeze(self) -> TAutomaton:
+        """Freeze the configuration of the automaton and of all its states.
+
+        A frozen automaton can still process events and can be used as a dict key."""
+        for state in self.states.values():
+            state.freeze()
+        self._frozen = True
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        """Return true if the automaton has been frozen."""
+        return self._frozen
+
+    def __hash__(self):
+        """Return a hash of the configuration of the automaton. Only frozen automata can be hashed."""
+        if not self._frozen:
+            raise TypeError(f"unhashable type: 'Automaton', {self.name} is not frozen")
+        return hash((self.name, self._initial_state.structural_hash()))
+
     def __eq__(self, o):
         if not isinstance(o, Automaton) or o is None:
             return False
 
         return (
             self.name == o.name
-            and self._initial_state == o.get_initial_state()
             and self.get_current_state().name == o.get_current_state().name
+            and self._initial_state == o.get_initial_state()
         )
 
     def __dict__(self):
@@ -278,8 +600,10 @@ class Automaton:
         if self.name:
             dct["name"] = self.name
         dct["version"] = self.version
-        dct["current_state"] = self._current_state.name
+        dct["current_state"] = self.get_current_state().name
         dct["initial_state"] = self._initial_state.name
+        if self.timeouts:
+            dct["timeouts"] = [[name, seconds, event] for name, (seconds, event) in self.timeouts.items()]
         return dct
 
     @staticmethod
@@ -288,21 +612,16 @@ class Automaton:
         return json.dumps(automaton.__dict__())
 
     @staticmethod
-    def load(automaton_dump:str):
+    def load(automaton_dump: str):
         """Return an automaton restored from the received dump in json format."""
         dct = json.loads(automaton_dump)
-        this = Automaton()
-        if "name" in dct:
-            this.name = dct["name"]
-        this.version = dct["version"]
-        state_list = dct["states"]
-        start_state = None
-        for name, event, action, target in state_list:
-            if start_state is None:
-                this.start_from(name)
-            else:
-                this.coming_from(name)
-            this.go_in(target).doing(action).when(event)
-        this.set_current_state(dct["current_state"])
+        this = Automaton(dct.get("name"), dct["version"])
+        _load_rows(dct["states"], this.states)
+        if dct["initial_state"] not in this.states:
+            this.states[dct["initial_state"]] = State(dct["initial_state"])
         this._initial_state = this.states[dct["initial_state"]]
+        this.set_current_state(dct["current_state"])
+        for name, seconds, event in dct.get("timeouts", ()):
+            this.timeouts[name] = TimeoutTuple(seconds, event)
         return this
+
@@ -0,0 +1,151 @@
+from collections import namedtuple
+from typing import Hashable, Iterable, List, Optional
+
+import mmap
+import os
+
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.compiled import MISSING, TransitionTable
+
+ScanResult = namedtuple("ScanResult", "final_state matches visits")
+
+RAISE = "raise"
+RESET = "reset"
+
+
+def _byte_value(event: Hashable) -> int:
+    """Return the byte value of an event, given as a bytes object of length 1, a str of length 1 or an int."""
+    if isinstance(event, (bytes, bytearray)) and len(event) == 1:
+        return event[0]
+    if isinstance(event, str) and len(event) == 1 and ord(event) < 256:
+        return ord(event)
+    if isinstance(event, int) and 0 <= event < 256:
+        return event
+    raise ValueError(f"Event {event!r} is not a single byte")
+
+
+def _byte_view(data) -> memoryview:
+    """Return a memoryview of unsigned bytes over a bytes-like object."""
+    view = memoryview(data)
+    return view if view.format == "B" and view.ndim == 1 else view.cast("B")
+
+
+class ByteRecognizer:
+    """
+    Recognizer scanning binary data with an automaton whose events are single bytes.
+
+    Events can be declared as bytes objects of length 1, str of length 1 (latin-1 code points) or ints, and a
+    ValueError is raised if a state declares two distinct events, such as "A" and 65, that are the same byte. The
+    automaton is compiled into a table of 256 columns per state and the data, a bytes-like object such as bytes,
+    memoryview or mmap, is scanned without creating a Python object per byte.
+
+    When a byte is not allowed in the current state, an IllegalEventError carrying its offset is raised if on_missing
+    is "raise". If on_missing is "reset", the scan restarts from the initial state on that same byte, remaining in the
+    initial state if the byte is not allowed there either.
+    """
+
+    def __init__(self, automaton: Automaton, on_missing: str = RAISE) -> None:
+        if on_missing not in (RAISE, RESET):
+            raise ValueError(f"on_missing must be {RAISE!r} or {RESET!r}, not {on_missing!r}")
+        table = TransitionTable.from_automaton(automaton)
+        self.table = table
+        self.on_missing = on_missing
+        byte_values = [_byte_value(event) for event in table.events]
+        rows = []
+        for state in range(table.n_states):
+            row = [MISSING] * 256
+            events = {}
+            for event, value in enumerate(byte_values):
+                next_state = table.next_state(state, event)
+                if next_state != MISSING:
+                    if value in events:
+                        raise ValueError(
+                            f"Events {table.events[events[value]]!r} and {table.events[event]!r} of state "
+                            f"{table.state_names[state]} are both the byte {value}"
+                        )
+                    events[value] = event
+                    row[value] = next_state
+            rows.append(row)
+        initial = rows[table.initial_state]
+        # Missing transitions lead to a dead state, whose row is None so that scanning past it fails immediately.
+        self._dead = table.n_states
+        for row in rows:
+            for value in range(256):
+                if row[value] == MISSING:
+                    if on_missing == RESET:
+                        row[value] = table.initial_state if initial[value] == MISSING else initial[value]
+                    else:
+                        row[value] = self._dead
+        self._rows: List[Optional[tuple]] = [tuple(row) for row in rows] + [None]
+
+    def _state_id(self, state_name: Optional[str]) -> int:
+        return self.table.initial_state if state_name is None else self.table.state_ids[state_name]
+
+    def _raise_at(self, data, state: int):
+        """Find the first byte not allowed in the data scanned from state and raise the corresponding error."""
+        rows = self._rows
+        for offset, value in enumerate(data):
+            next_state = rows[state][value]
+            if next_state == self._dead:
+                raise IllegalEventError(self.table.state_names[state], bytes([value]), offset)
+            state = next_state
+
+    def final_state(self, data, start: Optional[str] = None) -> str:
+        """Scan the data from the start state, the initial one by default, and return the name of the final state."""
+        rows = self._rows
+        state = initial = self._state_id(start)
+        with _byte_view(data) as view:
+            try:
+                for value in view:
+                    state = rows[state][value]
+            except TypeError:
+                state = self._dead
+            if state == self._dead:
+                self._raise_at(view, initial)
+        return self.table.state_names[state]
+
+    def scan(
+        self,
+        data,
+        accepting: Iterable[str] = (),
+        count_visits: bool = False,
+        start: Optional[str] = None,
+    ) -> ScanResult:
+        """Scan the data from the start state, the initial one by default.
+
+        Return the name of the final state, the offsets of the bytes on which one of the accepting states has been
+        entered and, if count_visits is set, the number of times each state has been entered.
+        """
+        if not accepting and not count_visits:
+            return ScanResult(self.final_state(data, start), [], {})
+        rows = self._rows
+        dead = self._dead
+        is_accepting = [False] * (dead + 1)
+        for name in accepting:
+            is_accepting[self.table.state_ids[name]] = True
+        visits = [0] * (dead + 1)
+        matches = []
+        state = initial = self._state_id(start)
+        with _byte_view(data) as view:
+            for offset, value in enumerate(view):
+                state = rows[state][value]
+                if state == dead:
+                    self._raise_at(view, initial)
+                if count_visits:
+                    visits[state] += 1
+                if is_accepting[state]:
+                    matches.append(offset)
+        names = self.table.state_names
+        return ScanResult(
+            names[state],
+            matches,
+            {names[i]: count for i, count in enumerate(visits[:dead]) if count} if count_visits else {},
+        )
+
+    def scan_file(self, path: str, **kwargs) -> ScanResult:
+        """Scan the content of a file, mapped in memory, accepting the same keyword arguments of scan."""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.scan(b"", **kwargs)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.scan(data, **kwargs)
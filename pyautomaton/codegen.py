@@ -0,0 +1,102 @@
+from typing import Callable, List, Optional
+
+import ast
+
+from pyautomaton.automaton import Automaton
+from pyautomaton.compiled import TransitionTable
+
+_HEADER = '''"""State machine stepper generated by pyautomaton.codegen, do not edit."""
+from pyautomaton.automaton import IllegalEventError
+
+NAME = {name}
+VERSION = {version}
+STATE_NAMES = {state_names}
+INITIAL_STATE = {initial_state}
+
+# The transitions of each state, mapping its events to the (action, next state dict) tuples.
+_STATES = [{{}} for _ in STATE_NAMES]
+'''
+
+_FOOTER = '''
+
+def new_stepper(current_state=INITIAL_STATE):
+    """Return a function executing the transitions of the state machine, starting from current_state.
+
+    The function behaves as Automaton.__call__ and exposes get_current_state and set_current_state as attributes."""
+    current = _TABLES[current_state]
+
+    def step(event):
+        nonlocal current
+        try:
+            action, current = current[event]
+        except KeyError:
+            raise IllegalEventError(_NAMES[id(current)], event) from None
+        return action
+
+    def get_current_state():
+        return _NAMES[id(current)]
+
+    def set_current_state(state_name):
+        nonlocal current
+        current = _TABLES[state_name]
+
+    step.get_current_state = get_current_state
+    step.set_current_state = set_current_state
+    return step
+'''
+
+
+def _literal(value) -> str:
+    """Return the source of a literal evaluating to the value, raising ValueError if there is none."""
+    source = repr(value)
+    try:
+        evaluated = ast.literal_eval(source)
+    except (ValueError, SyntaxError):
+        evaluated = None
+    if type(evaluated) is not type(value) or evaluated != value:
+        raise ValueError(f"{value!r} cannot be written as a Python literal")
+    return source
+
+
+def generate_source(automaton: Automaton) -> str:
+    """Return the source of a Python module implementing the automaton as a specialized stepper function.
+
+    Each state becomes a dict, mapping its events to the (action, next state dict) tuples, so that each event costs
+    a single dict lookup. The dicts are built once, when the module is executed, and shared by all the steppers
+    returned by its new_stepper(current_state=INITIAL_STATE). State names, events and actions must be Python
+    literals, e.g. strings, numbers or None."""
+    table = TransitionTable.from_automaton(automaton)
+    lines: List[str] = [
+        _HEADER.format(
+            name=_literal(automaton.name),
+            version=_literal(automaton.version),
+            state_names=_literal(table.state_names),
+            initial_state=_literal(table.state_names[table.initial_state]),
+        )
+    ]
+    for state, transitions in enumerate(table.dispatch):
+        if transitions:
+            entries = ", ".join(
+                f"{_literal(event)}: ({_literal(action)}, _STATES[{target}])"
+                for event, (action, target) in transitions.items()
+            )
+            lines.append(f"_STATES[{state}].update({{{entries}}})")
+    lines.append("_TABLES = dict(zip(STATE_NAMES, _STATES))")
+    lines.append("_NAMES = {id(table): name for name, table in _TABLES.items()}")
+    lines.append(_FOOTER)
+    return "\n".join(lines)
+
+
+def compile_stepper(automaton: Automaton, current_state: Optional[str] = None) -> Callable:
+    """Return a specialized stepper function equivalent to the automaton, starting from its current state by default."""
+    namespace = {}
+    exec(compile(generate_source(automaton), f"<pyautomaton stepper {automaton.name}>", "exec"), namespace)
+    if current_state is None:
+        current_state = automaton.get_current_state().name
+    return namespace["new_stepper"](current_state)
+
+
+def write_module(automaton: Automaton, path: str):
+    """Write the module generated for the automaton to the given path, so that it can be imported."""
+    with open(path, "w") as f:
+        f.write(generate_source(automaton))
@@ -0,0 +1,238 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterable, Iterator, List, Tuple, TypeVar
+
+import json
+
+from pyautomaton.automaton import ActionTargetTuple, IllegalEventError, _intern
+from pyautomaton.compiled import TransitionTable
+
+TCompactGraph = TypeVar("TCompactGraph", bound="CompactGraph")
+TCompactState = TypeVar("TCompactState", bound="CompactState")
+
+
+class CompactState(Mapping):
+    """
+    Read only view over a state of a CompactGraph, offering the Mapping API of State: the events allowed in the
+    state are its keys and the (action, target state) tuples are its values.
+    """
+
+    __slots__ = ("graph", "id")
+
+    def __init__(self, graph: "CompactGraph", state_id: int) -> None:
+        self.graph = graph
+        self.id = state_id
+
+    @property
+    def name(self) -> str:
+        """Return the name of the state."""
+        return self.graph.state_names[self.id]
+
+    def _find(self, event) -> int:
+        """Return the position of the transition of this state bound to the event, or -1 if there is none."""
+        graph = self.graph
+        event_id = graph.event_ids.get(event)
+        if event_id is None:
+            return -1
+        lo, hi = graph.offsets[self.id], graph.offsets[self.id + 1]
+        i = bisect_left(graph.row_events, event_id, lo, hi)
+        return i if i < hi and graph.row_events[i] == event_id else -1
+
+    def get_action(self, event):
+        """Return the action associated to the transition that will occurr when the event will be recieved."""
+        i = self._find(event)
+        if i < 0:
+            raise KeyError(event)
+        return self.graph.actions[self.graph.row_actions[i]]
+
+    def __getitem__(self, event) -> Tuple[str, TCompactState]:
+        """Return the action, if any, and the state associated to the given event.
+
+        An IllegalEventError is raised if the event is not allowed in this state."""
+        i = self._find(event)
+        if i < 0:
+            raise IllegalEventError(self.name, event)
+        graph = self.graph
+        return graph.actions[graph.row_actions[i]], CompactState(graph, graph.row_targets[i])
+
+    def __contains__(self, event):
+        """Returns true if the event is allowed in this state."""
+        return self._find(event) >= 0
+
+    def __iter__(self):
+        """Iterate over all the events defined for this state."""
+        graph = self.graph
+        events = graph.events
+        return (events[graph.row_events[i]] for i in range(graph.offsets[self.id], graph.offsets[self.id + 1]))
+
+    def __len__(self):
+        """Return the number of events defined over this state."""
+        return self.graph.offsets[self.id + 1] - self.graph.offsets[self.id]
+
+    @property
+    def transitions(self) -> Dict[Hashable, ActionTargetTuple]:
+        """Return a new dict mapping the events of this state to their (action, target state) tuples, as State does."""
+        graph = self.graph
+        return {
+            graph.events[graph.row_events[i]]: ActionTargetTuple(
+                graph.actions[graph.row_actions[i]], CompactState(graph, graph.row_targets[i])
+            )
+            for i in range(graph.offsets[self.id], graph.offsets[self.id + 1])
+        }
+
+    def __eq__(self, o):
+        if not isinstance(o, CompactState):
+            return False
+        return self.graph is o.graph and self.id == o.id
+
+    def __hash__(self):
+        return hash((id(self.graph), self.id))
+
+    def __repr__(self):
+        return "CompactState: " + self.name
+
+
+class CompactGraph(Mapping):
+    """
+    Memory lean, read only representation of the states of an automaton, mapping the state names to CompactState
+    views.
+
+    State names, events and actions are interned and stored once. The transitions are stored in compressed sparse row
+    form: the transitions of state i are at positions offsets[i] to offsets[i + 1] of three shared integer arrays,
+    holding the event, target state and action ids, sorted by event id.
+    """
+
+    def __init__(
+        self,
+        state_names: List[str],
+        events: List[Hashable],
+        actions: List,
+        offsets: array,
+        row_events: array,
+        row_targets: array,
+        row_actions: array,
+        initial_state: int = 0,
+        name=None,
+        version=1,
+    ) -> None:
+        self.state_names = state_names
+        self.events = events
+        self.actions = actions
+        self.offsets = offsets
+        self.row_events = row_events
+        self.row_targets = row_targets
+        self.row_actions = row_actions
+        self.initial_state = initial_state
+        self.name = name
+        self.version = version
+        self.state_ids: Dict[str, int] = {state_name: i for i, state_name in enumerate(state_names)}
+        self.event_ids: Dict[Hashable, int] = {event: i for i, event in enumerate(events)}
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Tuple], initial_state: str, name=None, version=1, state_names: Iterable[str] = ()
+    ) -> TCompactGraph:
+        """Build the graph from (state, event, action, target state) rows, like the ones of a dump.
+
+        The given state_names are added to the graph, in that order, even when no row refers to them. When several
+        rows share the same state and event, the last one wins."""
+        state_ids: Dict[str, int] = {}
+        for state_name in state_names:
+            state_ids.setdefault(_intern(state_name), len(state_ids))
+        event_ids: Dict[Hashable, int] = {}
+        action_ids: Dict = {}
+        action_values: List = []
+        sources, row_events, row_targets, row_actions = array("i"), array("i"), array("i"), array("i")
+        for state_name, event, action, target in rows:
+            sources.append(state_ids.setdefault(_intern(state_name), len(state_ids)))
+            row_events.append(event_ids.setdefault(_intern(event), len(event_ids)))
+            row_actions.append(TransitionTable._intern_action(_intern(action), action_ids, action_values))
+            row_targets.append(state_ids.setdefault(_intern(target), len(state_ids)))
+        state_ids.setdefault(_intern(initial_state), len(state_ids))
+        # Counting sort of the rows by source state, then by event id within each state.
+        offsets = array("i", bytes(4 * (len(state_ids) + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(len(state_ids)):
+            offsets[i + 1] += offsets[i]
+        order = array("i", bytes(4 * len(sources)))
+        fill = array("i", offsets)
+        for position, source in enumerate(sources):
+            order[fill[source]] = position
+            fill[source] += 1
+        del sources, fill
+        compact_offsets = array("i", [0])
+        events, targets, actions = array("i"), array("i"), array("i")
+        for i in range(len(state_ids)):
+            # sorted is stable, so that among the rows of the same event the last one is the last declared.
+            positions = sorted(order[offsets[i] : offsets[i + 1]], key=row_events.__getitem__)
+            for j, position in enumerate(positions):
+                if j + 1 < len(positions) and row_events[positions[j + 1]] == row_events[position]:
+                    continue
+                events.append(row_events[position])
+                targets.append(row_targets[position])
+                actions.append(row_actions[position])
+            compact_offsets.append(len(events))
+        return cls(
+            list(state_ids),
+            list(event_ids),
+            action_values,
+            compact_offsets,
+            events,
+            targets,
+            actions,
+            state_ids[initial_state],
+            name,
+            version,
+        )
+
+    @classmethod
+    def from_automaton(cls, automaton) -> TCompactGraph:
+        """Build the graph from the states declared on an Automaton."""
+        rows = (
+            (state_name, event, action_target.action, action_target.target.name)
+            for state_name, state in automaton.states.items()
+            for event, action_target in state.transitions.items()
+        )
+        return cls.from_rows(
+            rows, automaton.get_initial_state().name, automaton.name, automaton.version, automaton.states
+        )
+
+    @staticmethod
+    def load(automaton_dump: str) -> TCompactGraph:
+        """Return the graph of the states of an automaton dump, without building any State object."""
+        dct = json.loads(automaton_dump)
+        return CompactGraph.from_rows(dct["states"], dct["initial_state"], dct.get("name"), dct["version"])
+
+    def rows(self) -> Iterator[Tuple]:
+        """Iterate over the (state, event, action, target state) rows of all the transitions of the graph."""
+        for state_id, state_name in enumerate(self.state_names):
+            for i in range(self.offsets[state_id], self.offsets[state_id + 1]):
+                yield (
+                    state_name,
+                    self.events[self.row_events[i]],
+                    self.actions[self.row_actions[i]],
+                    self.state_names[self.row_targets[i]],
+                )
+
+    def get_initial_state(self) -> CompactState:
+        """Return the initial state of the graph."""
+        return CompactState(self, self.initial_state)
+
+    @property
+    def n_transitions(self) -> int:
+        """Return the number of transitions of the graph."""
+        return len(self.row_events)
+
+    def __getitem__(self, state_name: str) -> CompactState:
+        return CompactState(self, self.state_ids[state_name])
+
+    def __iter__(self):
+        return iter(self.state_names)
+
+    def __len__(self):
+        return len(self.state_names)
+
+    def __repr__(self):
+        return f"CompactGraph: {self.name} v{self.version}, {len(self)} states"
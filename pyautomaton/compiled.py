@@ -0,0 +1,167 @@
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from pyautomaton.automaton import IllegalEventError, State
+
+TTransitionTable = TypeVar("TTransitionTable", bound="TransitionTable")
+
+MISSING = -1
+
+
+def _action_key(action):
+    """Return the key under which an action is interned.
+
+    Hashable actions are interned by type and value, so that equal values of distinct types such as True and 1 are
+    kept apart, while unhashable actions are interned by identity."""
+    try:
+        hash(action)
+    except TypeError:
+        return id(action)
+    return type(action), action
+
+
+class TransitionTable:
+    """
+    Immutable, integer indexed representation of the transitions of an automaton, characterized by:
+     - the interned state, event and action names, each one identified by its position
+     - two flat tables of size (number of states * number of events) holding, for each (state, event) pair,
+     the id of the next state and the id of the action, or MISSING when the event is not allowed
+     - a dispatch list holding, for each state id, a dict mapping each allowed event to the (action, next state id)
+     tuple, used by the steppers that work with event names
+    """
+
+    def __init__(
+        self,
+        state_names: Sequence[str],
+        events: Sequence[Hashable],
+        actions: Sequence,
+        next_states: Sequence[int],
+        action_ids: Sequence[int],
+        initial_state: int = 0,
+    ) -> None:
+        self.state_names: Tuple[str, ...] = tuple(state_names)
+        self.events: Tuple[Hashable, ...] = tuple(events)
+        self.actions: Tuple = tuple(actions)
+        self.state_ids: Dict[str, int] = {name: i for i, name in enumerate(self.state_names)}
+        self.event_ids: Dict[Hashable, int] = {event: i for i, event in enumerate(self.events)}
+        self.next_states: Tuple[int, ...] = tuple(next_states)
+        self.action_ids: Tuple[int, ...] = tuple(action_ids)
+        self.initial_state = initial_state
+        width = len(self.events)
+        self.dispatch: Tuple[Dict[Hashable, Tuple], ...] = tuple(
+            {
+                event: (self.actions[self.action_ids[base + e]], self.next_states[base + e])
+                for e, event in enumerate(self.events)
+                if self.next_states[base + e] != MISSING
+            }
+            for base in range(0, len(self.state_names) * width, width)
+        )
+
+    @property
+    def n_states(self) -> int:
+        """Return the number of interned states."""
+        return len(self.state_names)
+
+    @property
+    def n_events(self) -> int:
+        """Return the number of interned events."""
+        return len(self.events)
+
+    @classmethod
+    def from_states(cls, states: Mapping[str, State], initial_state: str) -> TTransitionTable:
+        """Build the table from a mapping of state names to states, like the one of an Automaton."""
+        state_ids: Dict[str, int] = {}
+        event_ids: Dict[Hashable, int] = {}
+        action_ids: Dict = {}
+        actions: List = []
+        rows: List[Tuple[int, int, int, int]] = []
+        for name in states:
+            state_ids.setdefault(name, len(state_ids))
+        for name, state in states.items():
+            for event, action_target in state.transitions.items():
+                target = action_target.target.name
+                rows.append(
+                    (
+                        state_ids[name],
+                        event_ids.setdefault(event, len(event_ids)),
+                        cls._intern_action(action_target.action, action_ids, actions),
+                        state_ids.setdefault(target, len(state_ids)),
+                    )
+                )
+        width = len(event_ids)
+        next_states = [MISSING] * (len(state_ids) * width)
+        table_actions = [MISSING] * (len(state_ids) * width)
+        for source, event, action, target in rows:
+            next_states[source * width + event] = target
+            table_actions[source * width + event] = action
+        return cls(
+            list(state_ids),
+            list(event_ids),
+            actions,
+            next_states,
+            table_actions,
+            state_ids[initial_state],
+        )
+
+    @staticmethod
+    def _intern_action(action, action_ids: Dict, actions: List) -> int:
+        """Return the id of the action, appending it to actions the first time it is met."""
+        key = _action_key(action)
+        action_id = action_ids.get(key)
+        if action_id is None:
+            action_id = action_ids[key] = len(actions)
+            actions.append(action)
+        return action_id
+
+    @classmethod
+    def from_automaton(cls, automaton) -> TTransitionTable:
+        """Build the table from the states declared on an Automaton."""
+        return cls.from_states(automaton.states, automaton.get_initial_state().name)
+
+    def next_state(self, state_id: int, event_id: int) -> int:
+        """Return the id of the state reached from state_id on event_id, or MISSING if the event is not allowed."""
+        return self.next_states[state_id * len(self.events) + event_id]
+
+
+class CompiledAutomaton:
+    """Table driven state machine, behaving as the Automaton it has been compiled from."""
+
+    __slots__ = ("table", "_dispatch", "_current")
+
+    def __init__(self, table: TransitionTable, current_state: Optional[int] = None) -> None:
+        self.table = table
+        self._dispatch = table.dispatch
+        self._current = table.initial_state if current_state is None else current_state
+
+    def get_initial_state(self) -> str:
+        """Return the name of the initial state."""
+        return self.table.state_names[self.table.initial_state]
+
+    def get_current_state(self) -> str:
+        """Return the name of the current state."""
+        return self.table.state_names[self._current]
+
+    def set_current_state(self, state_name: str):
+        """Set the current state of the state machine"""
+        self._current = self.table.state_ids[state_name]
+
+    def __call__(self, event):
+        """Execute the state transition binded with the given event.
+
+        The action associated with the executed transition is returned and the current state is updated.
+        An IllegalEventError is raised if the event is not allowed in the current state.
+        """
+        try:
+            action, self._current = self._dispatch[self._current][event]
+        except KeyError:
+            raise IllegalEventError(self.table.state_names[self._current], event) from None
+        return action
+
+    def step(self, event_id: int) -> int:
+        """Execute the state transition binded with the given event id and return the id of the action."""
+        table = self.table
+        index = self._current * len(table.events) + event_id
+        next_state = table.next_states[index]
+        if next_state == MISSING:
+            raise IllegalEventError(table.state_names[self._current], table.events[event_id])
+        self._current = next_state
+        return table.action_ids[index]
@@ -0,0 +1,262 @@
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, TypeVar
+
+import hashlib
+import json
+
+from pyautomaton.automaton import ActionTargetTuple, Automaton, IllegalEventError, State, TimeoutTuple
+from pyautomaton.compiled import TransitionTable
+from pyautomaton.index import TransitionIndex
+
+TAutomatonDefinition = TypeVar("TAutomatonDefinition", bound="AutomatonDefinition")
+TAutomatonInstance = TypeVar("TAutomatonInstance", bound="AutomatonInstance")
+
+
+class UnknownDefinitionError(Exception):
+    """This error is thrown when a snapshot references a definition that has not been registered."""
+
+    def __init__(self, fingerprint):
+        Exception.__init__(self, f"Definition {fingerprint} is not registered")
+        self.fingerprint = fingerprint
+
+
+class AutomatonDefinition:
+    """
+    Immutable definition of a state machine, shared by any number of AutomatonInstance objects.
+
+    The definition owns a private, frozen copy of the states and timeouts of the automaton it is built from, so that
+    later changes to the configuration of that automaton are not reflected in the definition. A ValueError is raised
+    if the event of a timeout is not allowed in its state.
+    """
+
+    def __init__(self, automaton) -> None:
+        states = {name: State(name) for name in automaton.states}
+        for name, state in automaton.states.items():
+            for event, action_target in state.transitions.items():
+                target = action_target.target.name
+                if target not in states:
+                    states[target] = State(target)
+                states[name].transitions[event] = ActionTargetTuple(action_target.action, states[target])
+        for state in states.values():
+            state.freeze()
+        for name, (_, event) in automaton.timeouts.items():
+            if name not in states or event not in states[name].transitions:
+                raise ValueError(f"Timeout event {event} not supported in state {name}")
+        self._name = automaton.name
+        self._version = automaton.version
+        self._states = MappingProxyType(states)
+        self._timeouts: Mapping[str, TimeoutTuple] = MappingProxyType(dict(automaton.timeouts))
+        self._table = TransitionTable.from_states(states, automaton.get_initial_state().name)
+        self._state_objects: Tuple[State, ...] = tuple(states[name] for name in self._table.state_names)
+        self._fingerprint: Optional[str] = None
+        self._index: Optional[TransitionIndex] = None
+
+    @property
+    def name(self):
+        """Return the name of the state machine."""
+        return self._name
+
+    @property
+    def version(self):
+        """Return the version of the state machine."""
+        return self._version
+
+    @property
+    def states(self) -> Mapping[str, State]:
+        """Return a read only mapping of the state names to the states of the definition."""
+        return self._states
+
+    @property
+    def timeouts(self) -> Mapping[str, TimeoutTuple]:
+        """Return a read only mapping of the state names to the (seconds, event) timeouts declared on them."""
+        return self._timeouts
+
+    @property
+    def table(self) -> TransitionTable:
+        """Return the integer indexed transition table of the definition."""
+        return self._table
+
+    def get_initial_state(self) -> State:
+        """Return the initial state of the state machine."""
+        return self._state_objects[self._table.initial_state]
+
+    @property
+    def index(self) -> TransitionIndex:
+        """Return the TransitionIndex answering the routing queries over the states of the definition."""
+        if self._index is None:
+            self._index = TransitionIndex(self._states)
+        return self._index
+
+    def new_instance(self, state_name: Optional[str] = None) -> TAutomatonInstance:
+        """Return a new instance of the state machine, placed in the given state or in the initial one."""
+        instance = AutomatonInstance(self)
+        if state_name is not None:
+            instance.set_current_state(state_name)
+        return instance
+
+    def rows(self) -> List[Tuple]:
+        """Return the (state, event, action, target state) rows of all the transitions of the definition."""
+        return [
+            (name, event, action_target.action, action_target.target.name)
+            for name, state in self._states.items()
+            for event, action_target in state.transitions.items()
+        ]
+
+    @property
+    def fingerprint(self) -> str:
+        """Return a stable hash of the definition, computed over its name, version, initial state and transitions.
+
+        The hash does not depend on the order in which states and transitions have been declared."""
+        if self._fingerprint is None:
+            content = {
+                "name": self._name,
+                "version": self._version,
+                "initial_state": self.get_initial_state().name,
+                "states": sorted(json.dumps(row) for row in self.rows()),
+            }
+            if self._timeouts:
+                content["timeouts"] = sorted(json.dumps([name, *timeout]) for name, timeout in self._timeouts.items())
+            encoded = json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")
+            self._fingerprint = hashlib.sha256(encoded).hexdigest()
+        return self._fingerprint
+
+    def __dict__(self):
+        dct = {"states": self.rows()}
+        if self._name:
+            dct["name"] = self._name
+        dct["version"] = self._version
+        dct["current_state"] = self.get_initial_state().name
+        dct["initial_state"] = self.get_initial_state().name
+        if self._timeouts:
+            dct["timeouts"] = [[name, seconds, event] for name, (seconds, event) in self._timeouts.items()]
+        return dct
+
+    @staticmethod
+    def dump(definition: TAutomatonDefinition) -> str:
+        """Return a string dump in json format of the definition, readable by Automaton.load as well."""
+        return json.dumps(definition.__dict__())
+
+    @staticmethod
+    def load(definition_dump: str) -> TAutomatonDefinition:
+        """Return a definition restored from the received dump in json format."""
+        return AutomatonDefinition(Automaton.load(definition_dump))
+
+    def __eq__(self, o):
+        """Compare the definitions by fingerprint."""
+        if not isinstance(o, AutomatonDefinition):
+            return False
+        return self is o or self.fingerprint == o.fingerprint
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __repr__(self):
+        return f"AutomatonDefinition: {self._name} v{self._version}"
+
+
+class AutomatonInstance:
+    """
+    Running state machine, holding only a reference to its definition and the id of its current state.
+
+    Instances are meant to be created in large numbers through AutomatonDefinition.new_instance.
+    """
+
+    __slots__ = ("definition", "_current")
+
+    def __init__(self, definition: AutomatonDefinition, current_state: Optional[int] = None) -> None:
+        self.definition = definition
+        self._current = definition.table.initial_state if current_state is None else current_state
+
+    def get_initial_state(self) -> State:
+        """Return the initial state of the automaton."""
+        return self.definition.get_initial_state()
+
+    def get_current_state(self) -> State:
+        """Return the current state of the automaton."""
+        return self.definition._state_objects[self._current]
+
+    def set_current_state(self, state_name: str):
+        """Set the current state of the state machine"""
+        self._current = self.definition.table.state_ids[state_name]
+
+    def __call__(self, event):
+        """Execute the state transition binded with the given event.
+
+        The action associated with the executed transition is returned and the current state of the automaton is updated.
+        """
+        try:
+            action, self._current = self.definition._table.dispatch[self._current][event]
+        except KeyError:
+            raise IllegalEventError(self.definition._state_objects[self._current].name, event) from None
+        return action
+
+    @staticmethod
+    def dump(instance: TAutomatonInstance) -> str:
+        """Return a compact string dump in json format of the instance, referencing its definition by fingerprint.
+
+        The dump can be restored through a DefinitionRegistry in which the definition has been registered."""
+        return json.dumps(
+            {
+                "definition": instance.definition.fingerprint,
+                "current_state": instance.definition.table.state_names[instance._current],
+            }
+        )
+
+    def __repr__(self):
+        return f"AutomatonInstance: {self.get_current_state().name}"
+
+
+class _DefinitionCache:
+    """Bounded cache of the definitions built from Automaton objects, keyed by identity.
+
+    The cached automata are referenced, so that their ids are not reused while they are cached. Their configuration
+    is assumed not to change while the cache is in use."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.capacity = capacity
+        self._definitions: Dict[int, Tuple[Automaton, AutomatonDefinition]] = {}
+
+    def get(self, automaton: Automaton) -> AutomatonDefinition:
+        """Return the definition of the automaton, building it the first time the automaton is met."""
+        entry = self._definitions.get(id(automaton))
+        if entry is None:
+            if len(self._definitions) >= self.capacity:
+                del self._definitions[next(iter(self._definitions))]
+            entry = self._definitions[id(automaton)] = (automaton, automaton.define())
+        return entry[1]
+
+
+class DefinitionRegistry:
+    """Cache of definitions indexed by fingerprint, used to restore the instance dumps referencing them."""
+
+    def __init__(self) -> None:
+        self._definitions: Dict[str, AutomatonDefinition] = {}
+
+    def register(self, definition: AutomatonDefinition) -> AutomatonDefinition:
+        """Register the definition and return the registered one.
+
+        If an identical definition was already registered, the latter is returned so that it can be shared."""
+        return self._definitions.setdefault(definition.fingerprint, definition)
+
+    def get(self, fingerprint: str) -> AutomatonDefinition:
+        """Return the definition with the given fingerprint.
+
+        An UnknownDefinitionError is raised if no such definition has been registered."""
+        try:
+            return self._definitions[fingerprint]
+        except KeyError:
+            raise UnknownDefinitionError(fingerprint) from None
+
+    def __contains__(self, fingerprint):
+        """Returns true if a definition with the given fingerprint has been registered."""
+        return fingerprint in self._definitions
+
+    def __len__(self):
+        """Return the number of registered definitions."""
+        return len(self._definitions)
+
+    def load(self, instance_dump: str) -> AutomatonInstance:
+        """Return an instance restored from a dump produced by AutomatonInstance.dump."""
+        dct = json.loads(instance_dump)
+        definition = self.get(dct["definition"])
+        return AutomatonInstance(definition, definition.table.state_ids[dct["current_state"]])
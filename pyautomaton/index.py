@@ -0,0 +1,38 @@
+from typing import Dict, FrozenSet, Hashable, Mapping, Set
+
+from pyautomaton.automaton import State
+
+_EMPTY: FrozenSet = frozenset()
+
+
+class TransitionIndex:
+    """
+    Precomputed answers to the routing queries over the transitions of a set of states:
+     - the events allowed in each state
+     - the states in which each event is allowed
+     - the predecessors of each state, i.e. the states with a transition towards it
+    """
+
+    def __init__(self, states: Mapping[str, State]) -> None:
+        sources: Dict[Hashable, Set[str]] = {}
+        predecessors: Dict[str, Set[str]] = {}
+        self._allowed_events: Dict[str, FrozenSet] = {}
+        for name, state in states.items():
+            self._allowed_events[name] = frozenset(state.transitions)
+            for event, action_target in state.transitions.items():
+                sources.setdefault(event, set()).add(name)
+                predecessors.setdefault(action_target.target.name, set()).add(name)
+        self._sources: Dict[Hashable, FrozenSet[str]] = {e: frozenset(names) for e, names in sources.items()}
+        self._predecessors: Dict[str, FrozenSet[str]] = {n: frozenset(names) for n, names in predecessors.items()}
+
+    def allowed_events(self, state_name: str) -> FrozenSet:
+        """Return the events allowed in the given state."""
+        return self._allowed_events.get(state_name, _EMPTY)
+
+    def sources(self, event) -> FrozenSet[str]:
+        """Return the names of the states in which the given event is allowed."""
+        return self._sources.get(event, _EMPTY)
+
+    def predecessors(self, state_name: str) -> FrozenSet[str]:
+        """Return the names of the states having a transition towards the given state."""
+        return self._predecessors.get(state_name, _EMPTY)
@@ -0,0 +1,168 @@
+from typing import Dict, List, Tuple
+
+import json
+import mmap
+import os
+import re
+import struct
+
+from pyautomaton.definition import AutomatonDefinition, AutomatonInstance
+
+_RECORD = struct.Struct("<HI")
+_JOURNAL = re.compile(r"^journal-(\d{8})\.log$")
+_SNAPSHOT = "snapshot.json"
+
+
+class JournalMismatchError(Exception):
+    """This error is thrown when a journal directory holds a snapshot taken for a different definition."""
+
+    def __init__(self, expected, found):
+        Exception.__init__(self, f"Snapshot taken for definition {found}, expected {expected}")
+        self.expected = expected
+        self.found = found
+
+
+def _replay(path: str, transitions, states: Dict[bytes, int], initial_state: int):
+    """Replay the records of a journal file over the state ids of the instances, ignoring a torn trailing record.
+
+    Instances are keyed by their encoded id and transitions map each state id to a dict of the encoded events
+    allowed in that state to the id of the next state, so that records do not need to be decoded."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            unpack = _RECORD.unpack_from
+            header = _RECORD.size
+            offset = 0
+            while offset + header <= size:
+                id_length, event_length = unpack(data, offset)
+                start = offset + header
+                end = start + id_length + event_length
+                if end > size:
+                    break
+                instance_id = data[start : start + id_length]
+                state = states.get(instance_id, initial_state)
+                states[instance_id] = transitions[state].get(data[start + id_length : end], state)
+                offset = end
+
+
+class TransitionJournal:
+    """
+    Append only journal of the events received by the instances of a definition, used to recover them after a crash.
+
+    The journal directory holds:
+     - the journal files, made of binary (instance id, event) records, both strings. A new journal file, with a
+     growing generation number, is started each time the journal is opened and at each compaction
+     - a json snapshot of the current state of each instance, covering all the journal files older than the
+     generation it records
+
+    Records are buffered and written, then synced to disk, every fsync_every records or on flush. Events that are
+    not allowed in the current state of their instance are ignored on replay, as they were when first received.
+    """
+
+    def __init__(self, directory: str, definition: AutomatonDefinition, fsync_every: int = 1000) -> None:
+        self.directory = directory
+        self.definition = definition
+        self.fsync_every = fsync_every
+        self._buffer = bytearray()
+        self._pending = 0
+        os.makedirs(directory, exist_ok=True)
+        generations = self._generations()
+        self._generation = generations[-1] + 1 if generations else 0
+        self._file = open(self._journal_path(self._generation), "ab")
+
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"journal-{generation:08d}.log")
+
+    def _generations(self) -> List[int]:
+        return sorted(int(m.group(1)) for m in map(_JOURNAL.match, os.listdir(self.directory)) if m)
+
+    def append(self, instance_id: str, event: str):
+        """Record that the event has been sent to the instance."""
+        encoded_id = instance_id.encode("utf-8")
+        encoded_event = event.encode("utf-8")
+        self._buffer += _RECORD.pack(len(encoded_id), len(encoded_event))
+        self._buffer += encoded_id
+        self._buffer += encoded_event
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records and sync the journal file to disk."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        """Flush and close the journal."""
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _load_snapshot(self) -> Tuple[int, Dict[bytes, int]]:
+        path = os.path.join(self.directory, _SNAPSHOT)
+        if not os.path.exists(path):
+            return 0, {}
+        with open(path) as f:
+            snapshot = json.load(f)
+        if snapshot["definition"] != self.definition.fingerprint:
+            raise JournalMismatchError(self.definition.fingerprint, snapshot["definition"])
+        state_ids = self.definition.table.state_ids
+        return snapshot["generation"], {
+            key.encode("utf-8"): state_ids[name] for key, name in snapshot["instances"].items()
+        }
+
+    def _recover_ids(self, until: int) -> Dict[str, int]:
+        generation, states = self._load_snapshot()
+        table = self.definition.table
+        transitions = [
+            {event.encode("utf-8"): target for event, (_, target) in dispatch.items() if isinstance(event, str)}
+            for dispatch in table.dispatch
+        ]
+        for journal in self._generations():
+            if generation <= journal < until:
+                _replay(self._journal_path(journal), transitions, states, table.initial_state)
+        return {key.decode("utf-8"): state for key, state in states.items()}
+
+    def recover(self) -> Dict[str, AutomatonInstance]:
+        """Return the instances restored from the latest snapshot and the journal records following it."""
+        self.flush()
+        return {
+            key: AutomatonInstance(self.definition, state)
+            for key, state in self._recover_ids(self._generation + 1).items()
+        }
+
+    def compact(self):
+        """Fold the snapshot and the journal files into a new snapshot, then delete the folded journal files.
+
+        Appends after the compaction go to a new journal file. A crash at any point of the compaction leaves the
+        directory recoverable."""
+        self.close()
+        folded = self._generation + 1
+        self._generation = folded
+        self._file = open(self._journal_path(folded), "ab")
+        state_names = self.definition.table.state_names
+        snapshot = {
+            "definition": self.definition.fingerprint,
+            "generation": folded,
+            "instances": {key: state_names[state] for key, state in self._recover_ids(folded).items()},
+        }
+        path = os.path.join(self.directory, _SNAPSHOT)
+        with open(path + ".tmp", "w") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        for journal in self._generations():
+            if journal < folded:
+                os.remove(self._journal_path(journal))
@@ -0,0 +1,147 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import json
+
+from pyautomaton.automaton import Automaton
+from pyautomaton.definition import AutomatonDefinition, AutomatonInstance, DefinitionRegistry, _DefinitionCache
+
+
+class JsonLinesWriter:
+    """
+    Streaming writer of automata to a text file in JSON Lines format, one line per automaton.
+
+    Each line holds the AutomatonInstance.dump of an automaton, referencing its definition by fingerprint. The first
+    time a definition is met, it is written on a line of its own, {"fingerprint": ..., "automaton": ...}, holding the
+    AutomatonDefinition.dump of the definition. Automaton objects are written through the definition built from
+    them, so that identical automata share the same definition line. The definitions of the last definition_cache_size
+    Automaton objects written are kept, so that an automaton written many times is defined once: its configuration
+    must not change while the writer is in use.
+    """
+
+    def __init__(self, file: IO[str], definition_cache_size: int = 1024) -> None:
+        self.file = file
+        self._definitions = _DefinitionCache(definition_cache_size)
+        self._written: Dict[str, AutomatonDefinition] = {}
+        # Instance lines only depend on the definition and the state, so they are encoded once.
+        self._lines: Dict[Tuple[int, int], str] = {}
+
+    def _write_definition(self, definition: AutomatonDefinition) -> AutomatonDefinition:
+        """Write the line of the definition, unless already written, and return the written one."""
+        written = self._written.get(definition.fingerprint)
+        if written is None:
+            self.file.write(json.dumps({"fingerprint": definition.fingerprint, "automaton": definition.__dict__()}))
+            self.file.write("\n")
+            written = self._written[definition.fingerprint] = definition
+        return written
+
+    def _line(self, definition: AutomatonDefinition, state_id: int) -> str:
+        line = self._lines.get((id(definition), state_id))
+        if line is None:
+            record = {"definition": definition.fingerprint, "current_state": definition.table.state_names[state_id]}
+            line = self._lines[(id(definition), state_id)] = json.dumps(record) + "\n"
+        return line
+
+    def write(self, automaton: Union[Automaton, AutomatonInstance]):
+        """Write the line of the automaton, preceded by the line of its definition if not written yet."""
+        is_instance = isinstance(automaton, AutomatonInstance)
+        definition = automaton.definition if is_instance else self._definitions.get(automaton)
+        written = self._write_definition(definition)
+        if is_instance and written is definition:
+            state_id = automaton._current
+        else:
+            # An equal definition may have interned its states in a different order.
+            state_id = written.table.state_ids[automaton.get_current_state().name]
+        self.file.write(self._line(written, state_id))
+
+    def write_all(self, automata: Iterable[Union[Automaton, AutomatonInstance]]) -> int:
+        """Write the lines of all the given automata, consumed one at a time, and return their number."""
+        count = 0
+        for automaton in automata:
+            self.write(automaton)
+            count += 1
+        return count
+
+
+def dump_lines(automata: Iterable[Union[Automaton, AutomatonInstance]], file: IO[str]) -> int:
+    """Write the given automata to the file in JSON Lines format and return their number, see JsonLinesWriter."""
+    return JsonLinesWriter(file).write_all(automata)
+
+
+def _decode_chunk(lines: List[str]) -> list:
+    """Decode a chunk of lines into definition dicts and (fingerprint, state name) tuples, skipping blank lines.
+
+    Instance lines repeat as many times as instances share the same definition and state, so each distinct one is
+    decoded once per chunk."""
+    decoded = []
+    instances: Dict[str, Tuple[str, str]] = {}
+    for line in lines:
+        instance = instances.get(line)
+        if instance is not None:
+            decoded.append(instance)
+            continue
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "fingerprint" in record:
+            decoded.append(record)
+        else:
+            instance = instances[line] = (record["definition"], record["current_state"])
+            decoded.append(instance)
+    return decoded
+
+
+def _chunks(file: IO[str], chunk_size: int) -> Iterator[List[str]]:
+    while True:
+        lines = list(islice(file, chunk_size))
+        if not lines:
+            return
+        yield lines
+
+
+def _decoded_chunks(file: IO[str], chunk_size: int, workers: Optional[int]) -> Iterator[list]:
+    """Yield the decoded chunks of the file in order, decoding up to twice as many chunks as workers in parallel."""
+    if not workers or workers < 2:
+        for lines in _chunks(file, chunk_size):
+            yield _decode_chunk(lines)
+        return
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending: deque = deque()
+    try:
+        for lines in _chunks(file, chunk_size):
+            pending.append(executor.submit(_decode_chunk, lines))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+
+
+def load_lines(
+    file: IO[str],
+    registry: Optional[DefinitionRegistry] = None,
+    chunk_size: int = 10_000,
+    workers: Optional[int] = None,
+) -> Iterator[AutomatonInstance]:
+    """Lazily yield the instances read from a file written by JsonLinesWriter, in the order they have been written.
+
+    The file is read chunk_size lines at a time, and chunks are decoded by as many worker processes when workers is
+    greater than one, so that memory usage is bounded whatever the size of the file. Definitions are registered in
+    the given registry, which can also hold definitions referenced but not written in the file; an
+    UnknownDefinitionError is raised for lines referencing an unknown definition."""
+    if registry is None:
+        registry = DefinitionRegistry()
+    for chunk in _decoded_chunks(file, chunk_size, workers):
+        for record in chunk:
+            if isinstance(record, dict):
+                if record["fingerprint"] not in registry:
+                    registry.register(AutomatonDefinition.load(json.dumps(record["automaton"])))
+                continue
+            fingerprint, state_name = record
+            definition = registry.get(fingerprint)
+            yield AutomatonInstance(definition, definition.table.state_ids[state_name])
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from typing import Dict, Hashable, Tuple
+
+import time
+
+from pyautomaton.automaton import State, TransitionListener
+
+
+class MetricsCollector(TransitionListener):
+    """
+    Listener collecting metrics about the transitions executed by the automata it is registered to, made of:
+     - the number of transitions executed for each (state, event) pair
+     - the number of illegal events received for each (state, event) pair
+     - for each (state, event) pair, an histogram of the latencies of the transitions, with power of two
+     nanoseconds buckets
+
+    The latency of a transition is the time elapsed, within Automaton.__call__, from the before_transition
+    notification of this collector to its after_transition notification: it covers the lookup and update of the
+    current state, and the notifications of the listeners registered after this collector (before the transition)
+    or before it (after the transition). It does not cover the code handling the returned action, which runs once
+    the automaton has returned. Start times are kept per automaton, so that a collector can be shared by automata
+    whose transitions interleave, e.g. when a listener of one automaton drives another.
+    """
+
+    def __init__(self, clock=time.perf_counter_ns) -> None:
+        self._clock = clock
+        self._started: Dict[int, int] = {}
+        self.transitions: Dict[Tuple[str, Hashable], int] = defaultdict(int)
+        self.illegal_events: Dict[Tuple[str, Hashable], int] = defaultdict(int)
+        self.latencies: Dict[Tuple[str, Hashable], Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def before_transition(self, automaton, state: State, event):
+        self._started[id(automaton)] = self._clock()
+
+    def after_transition(self, automaton, source: State, event, action, target: State):
+        elapsed = self._clock() - self._started.pop(id(automaton))
+        key = (source.name, event)
+        self.transitions[key] += 1
+        self.latencies[key][1 << elapsed.bit_length()] += 1
+
+    def illegal_event(self, automaton, state: State, event):
+        self._started.pop(id(automaton), None)
+        self.illegal_events[(state.name, event)] += 1
+
+    def reset(self):
+        """Discard all the collected metrics."""
+        self.transitions.clear()
+        self.illegal_events.clear()
+        self.latencies.clear()
+
+    def snapshot(self) -> Dict:
+        """Return the collected metrics as a dict nested by state and event.
+
+        Latency histograms map the upper bound in nanoseconds of each bucket to the number of transitions in it."""
+
+        def nest(metrics):
+            nested = {}
+            for (state, event), value in metrics.items():
+                nested.setdefault(state, {})[event] = dict(value) if isinstance(value, dict) else value
+            return nested
+
+        return {
+            "transitions": nest(self.transitions),
+            "illegal_events": nest(self.illegal_events),
+            "latency_ns": nest(self.latencies),
+        }
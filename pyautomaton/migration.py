@@ -0,0 +1,89 @@
+from collections import namedtuple
+from typing import Dict, FrozenSet, Hashable, Mapping, Optional, Sequence, Tuple
+
+from pyautomaton.compiled import MISSING
+from pyautomaton.definition import AutomatonDefinition, AutomatonInstance
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional extra
+    np = None
+
+MigrationReport = namedtuple("MigrationReport", "migrated unmapped")
+
+
+class Migration:
+    """
+    Validated mapping of the states of an old definition to the states of a new one, used to move running instances
+    to the new definition without rebuilding any state.
+
+    States are mapped to the state with the same name in the new definition, unless the mapping says otherwise. The
+    mapping is checked once against both definitions, and turned into a table of new state ids indexed by old state
+    id, MISSING for the old states that have no counterpart.
+    """
+
+    def __init__(
+        self, old: AutomatonDefinition, new: AutomatonDefinition, mapping: Optional[Mapping[str, str]] = None
+    ) -> None:
+        mapping = dict(mapping or {})
+        unknown = [name for name in mapping if name not in old.states]
+        if unknown:
+            raise ValueError(f"States {unknown} not declared in {old!r}")
+        missing = [name for name in mapping.values() if name not in new.states]
+        if missing:
+            raise ValueError(f"States {missing} not declared in {new!r}")
+        self.old = old
+        self.new = new
+        new_ids = new.table.state_ids
+        targets = [mapping.get(name, name) for name in old.table.state_names]
+        self.state_map: Tuple[int, ...] = tuple(new_ids.get(target, MISSING) for target in targets)
+        self.unmapped_states: FrozenSet[str] = frozenset(
+            name for name, new_id in zip(old.table.state_names, self.state_map) if new_id == MISSING
+        )
+
+    def remap_ids(self, state_ids: Sequence[int]):
+        """Return the new state ids of the given old state ids, MISSING for the unmapped ones.
+
+        A NumPy array of ids is remapped in a single vectorized lookup and an array is returned, a list otherwise."""
+        if np is not None and isinstance(state_ids, np.ndarray):
+            return np.asarray(self.state_map, dtype=np.intp)[state_ids]
+        state_map = self.state_map
+        return [state_map[state_id] for state_id in state_ids]
+
+    def migrate(self, instances: Mapping[Hashable, AutomatonInstance]) -> MigrationReport:
+        """Move the given instances of the old definition, in place, to the new definition.
+
+        Instances in unmapped states are left untouched and returned in the report, mapped to the name of their
+        current state, along with the number of migrated instances. A ValueError is raised, before migrating any
+        instance, if an instance does not belong to the old definition."""
+        old = self.old
+        for key, instance in instances.items():
+            if instance.definition is not old and instance.definition != old:
+                raise ValueError(f"Instance {key} does not belong to {old!r}")
+        new = self.new
+        state_map = self.state_map
+        unmapped: Dict[Hashable, str] = {}
+        migrated = 0
+        for key, instance in instances.items():
+            old_id = instance._current
+            if instance.definition is not old:
+                # An equal definition may have interned its states in a different order.
+                old_id = old.table.state_ids[instance.definition.table.state_names[old_id]]
+            new_id = state_map[old_id]
+            if new_id == MISSING:
+                unmapped[key] = old.table.state_names[old_id]
+                continue
+            instance.definition = new
+            instance._current = new_id
+            migrated += 1
+        return MigrationReport(migrated, unmapped)
+
+
+def migrate(
+    old: AutomatonDefinition,
+    new: AutomatonDefinition,
+    instances: Mapping[Hashable, AutomatonInstance],
+    mapping: Optional[Mapping[str, str]] = None,
+) -> MigrationReport:
+    """Move the given instances of the old definition to the new one, see Migration.migrate."""
+    return Migration(old, new, mapping).migrate(instances)
@@ -0,0 +1,95 @@
+from collections import namedtuple
+from typing import Dict, Hashable, List, Mapping, Set, Tuple
+
+from pyautomaton.automaton import Automaton, State, _load_rows
+from pyautomaton.compiled import _action_key
+
+MinimizationResult = namedtuple(
+    "MinimizationResult", "automaton states_before states_after transitions_before transitions_after"
+)
+
+
+def _partition(states: List[State], timeouts: Mapping[str, Tuple] = {}) -> List[int]:
+    """Return, for each state, the id of its block in the coarsest partition of equivalent states.
+
+    Two states are equivalent when they emit the same actions on every sequence of events, and reject the same
+    sequences. The partition is refined with Hopcroft's algorithm, starting from the blocks of states allowing the
+    same events with the same actions, and declaring the same timeout. Actions are compared as interned by
+    TransitionTable, so that unhashable ones are only the same action when they are the same object."""
+    index = {state.name: i for i, state in enumerate(states)}
+    signatures: Dict[Tuple, int] = {}
+    block_of: List[int] = []
+    for state in states:
+        signature = (
+            frozenset((event, _action_key(at.action)) for event, at in state.transitions.items()),
+            timeouts.get(state.name),
+        )
+        block_of.append(signatures.setdefault(signature, len(signatures)))
+    blocks: List[Set[int]] = [set() for _ in signatures]
+    for i, block in enumerate(block_of):
+        blocks[block].add(i)
+
+    inverse: Dict[Hashable, Dict[int, List[int]]] = {}
+    for i, state in enumerate(states):
+        for event, at in state.transitions.items():
+            inverse.setdefault(event, {}).setdefault(index[at.target.name], []).append(i)
+
+    pending: Set[Tuple[int, Hashable]] = {(block, event) for block in range(len(blocks)) for event in inverse}
+    while pending:
+        splitter, event = pending.pop()
+        predecessors = inverse[event]
+        touched: Dict[int, Set[int]] = {}
+        for target in blocks[splitter]:
+            for source in predecessors.get(target, ()):
+                touched.setdefault(block_of[source], set()).add(source)
+        for block, inside in touched.items():
+            if len(inside) == len(blocks[block]):
+                continue
+            outside = blocks[block] - inside
+            smaller, larger = (inside, outside) if len(inside) <= len(outside) else (outside, inside)
+            new_block = len(blocks)
+            blocks[block] = larger
+            blocks.append(smaller)
+            for i in smaller:
+                block_of[i] = new_block
+            # The larger half keeps the id of the split block: if that was pending both halves are now pending,
+            # otherwise splitting by the smaller half is enough.
+            for split_event in inverse:
+                pending.add((new_block, split_event))
+    return block_of
+
+
+def minimize(automaton: Automaton) -> MinimizationResult:
+    """Return the minimal automaton behaving as the given one, together with the achieved reduction.
+
+    States unreachable from the initial state are dropped and equivalent states are merged into the first of them,
+    in breadth first order from the initial state. The minimal automaton is placed in the state corresponding to the
+    current state of the given one, or in its initial state if the current state is unreachable."""
+    states = automaton.get_initial_state()._reachable()
+    block_of = _partition(states, automaton.timeouts)
+    representatives: Dict[int, State] = {}
+    for state, block in zip(states, block_of):
+        representatives.setdefault(block, state)
+    block_by_name = {state.name: block for state, block in zip(states, block_of)}
+
+    rows = [
+        (state.name, event, at.action, representatives[block_by_name[at.target.name]].name)
+        for state in representatives.values()
+        for event, at in state.transitions.items()
+    ]
+    minimal = Automaton(automaton.name, automaton.version).start_from(states[0].name)
+    _load_rows(rows, minimal.states)
+    for state in representatives.values():
+        if state.name in automaton.timeouts:
+            minimal.timeouts[state.name] = automaton.timeouts[state.name]
+    current = automaton.get_current_state().name
+    if current in block_by_name:
+        minimal.set_current_state(representatives[block_by_name[current]].name)
+
+    return MinimizationResult(
+        minimal,
+        len(automaton.states),
+        len(minimal.states),
+        sum(len(state) for state in automaton.states.values()),
+        len(rows),
+    )
@@ -0,0 +1,96 @@
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.compiled import TransitionTable
+
+
+class ProductAutomaton:
+    """
+    Synchronous product of several automata, running side by side on the same stream of events.
+
+    The states of the product are the tuples of the states of its components: an event is allowed only if all the
+    components allow it, and the tuple of the actions of the components is emitted. Product states are discovered
+    lazily, the first time each (product state, event) pair is executed, and cached so that afterwards each event
+    costs a single lookup instead of one call per component.
+    """
+
+    def __init__(self, *automata: Automaton) -> None:
+        if not automata:
+            raise ValueError("A product needs at least one automaton")
+        self.tables: Tuple[TransitionTable, ...] = tuple(TransitionTable.from_automaton(a) for a in automata)
+        self._components: List[Tuple[int, ...]] = []
+        self._ids: Dict[Tuple[int, ...], int] = {}
+        self._dispatch: List[Dict[Hashable, Tuple[Tuple, int]]] = []
+        self._initial = self._intern(tuple(table.initial_state for table in self.tables))
+        self._current = self._intern(
+            tuple(table.state_ids[a.get_current_state().name] for table, a in zip(self.tables, automata))
+        )
+
+    def _intern(self, components: Tuple[int, ...]) -> int:
+        state = self._ids.get(components)
+        if state is None:
+            state = self._ids[components] = len(self._components)
+            self._components.append(components)
+            self._dispatch.append({})
+        return state
+
+    def _names(self, state: int) -> Tuple[str, ...]:
+        return tuple(table.state_names[i] for table, i in zip(self.tables, self._components[state]))
+
+    def _expand(self, state: int, event) -> Tuple[Tuple, int]:
+        """Compute, cache and return the (actions, next state) transition of the product state on the event."""
+        actions = []
+        targets = []
+        for table, component in zip(self.tables, self._components[state]):
+            transition = table.dispatch[component].get(event)
+            if transition is None:
+                raise IllegalEventError(self._names(state), event)
+            actions.append(transition[0])
+            targets.append(transition[1])
+        transition = self._dispatch[state][event] = (tuple(actions), self._intern(tuple(targets)))
+        return transition
+
+    def __len__(self):
+        """Return the number of product states discovered so far."""
+        return len(self._components)
+
+    def get_initial_state(self) -> Tuple[str, ...]:
+        """Return the tuple of the names of the initial states of the components."""
+        return self._names(self._initial)
+
+    def get_current_state(self) -> Tuple[str, ...]:
+        """Return the tuple of the names of the current states of the components."""
+        return self._names(self._current)
+
+    def set_current_state(self, state_names: Sequence[str]):
+        """Set the current state of each component, given the tuple of their names."""
+        self._current = self._intern(tuple(table.state_ids[name] for table, name in zip(self.tables, state_names)))
+
+    def __call__(self, event) -> Tuple:
+        """Execute the state transition binded with the given event on all the components.
+
+        The tuple of the actions of the components is returned. An IllegalEventError, whose state is the tuple of the
+        current states of the components, is raised if any of the components does not allow the event.
+        """
+        try:
+            actions, self._current = self._dispatch[self._current][event]
+        except KeyError:
+            actions, self._current = self._expand(self._current, event)
+        return actions
+
+    def explore(self) -> int:
+        """Discover all the product states reachable from the initial and current states and return their number."""
+        events = {event for table in self.tables for event in table.events}
+        visited = {self._initial, self._current}
+        pending = list(visited)
+        while pending:
+            state = pending.pop()
+            for event in events:
+                try:
+                    _, target = self._dispatch[state].get(event) or self._expand(state, event)
+                except IllegalEventError:
+                    continue
+                if target not in visited:
+                    visited.add(target)
+                    pending.append(target)
+        return len(visited)
@@ -0,0 +1,198 @@
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import multiprocessing
+
+from pyautomaton.automaton import IllegalEventError
+from pyautomaton.compiled import MISSING
+from pyautomaton.definition import AutomatonDefinition
+
+
+def _serve(connection, definition_dump: str):
+    """Worker loop: hold the current state id of each key of the shard and serve the requests of the executor."""
+    table = AutomatonDefinition.load(definition_dump).table
+    dispatch = table.dispatch
+    state_names = table.state_names
+    state_ids = table.state_ids
+    initial_state = table.initial_state
+    # (action id, next state id) of each event id in each state, None where the event is not allowed.
+    transitions = []
+    for state in range(table.n_states):
+        row = []
+        for event in range(table.n_events):
+            next_state = table.next_state(state, event)
+            action_id = table.action_ids[state * table.n_events + event]
+            row.append(None if next_state == MISSING else (action_id, next_state))
+        transitions.append(row)
+    states: Dict[Hashable, int] = {}
+    while True:
+        command, payload = connection.recv()
+        if command == "step":
+            results = []
+            for key, event in payload:
+                state = states.get(key, initial_state)
+                try:
+                    action, states[key] = dispatch[state][event]
+                except KeyError:
+                    results.append(IllegalEventError(state_names[state], event))
+                else:
+                    results.append(action)
+            connection.send(results)
+        elif command == "step_ids":
+            keys, event_ids = payload
+            results = array("i")
+            append = results.append
+            for key, event_id in zip(keys, event_ids):
+                transition = transitions[states.get(key, initial_state)][event_id]
+                if transition is None:
+                    append(MISSING)
+                else:
+                    append(transition[0])
+                    states[key] = transition[1]
+            connection.send(results)
+        elif command == "snapshot":
+            connection.send({key: state_names[state] for key, state in states.items()})
+        elif command == "restore":
+            states.update((key, state_ids[name]) for key, name in payload.items())
+            connection.send(None)
+        elif command == "close":
+            connection.close()
+            return
+
+
+class ShardedExecutor:
+    """
+    Step a fleet of instances of a shared definition across worker processes.
+
+    Keys are partitioned by hash across the workers, each one holding the current state of the instances of its
+    shard. Instances are created in the initial state the first time an event is sent to their key. The definition
+    is shipped to the workers through AutomatonDefinition.dump, while shards are snapshotted as compact mappings
+    of keys to state names.
+
+    step partitions a batch of (key, event) pairs and collects the actions in the parent process, which bounds the
+    achievable throughput. Callers able to produce the events of each shard on their own, e.g. consuming partitioned
+    streams, should use step_shards, which ships arrays of event ids and returns arrays of action ids.
+    """
+
+    def __init__(self, definition: AutomatonDefinition, workers: Optional[int] = None, context=None) -> None:
+        self.definition = definition
+        self.workers = workers or multiprocessing.cpu_count()
+        self._context = context or multiprocessing.get_context()
+        self._connections = []
+        self._processes = []
+
+    def start(self):
+        """Start the worker processes."""
+        dump = AutomatonDefinition.dump(self.definition)
+        for _ in range(self.workers):
+            parent, child = self._context.Pipe()
+            process = self._context.Process(target=_serve, args=(child, dump), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        return self
+
+    def close(self):
+        """Stop the worker processes, discarding the state of their shards."""
+        for connection in self._connections:
+            connection.send(("close", None))
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _check_running(self):
+        if not self._connections:
+            raise RuntimeError("The executor has no running workers, start it first")
+
+    def shard_of(self, key: Hashable) -> int:
+        """Return the index of the worker holding the instance bound to the key."""
+        return hash(key) % self.workers
+
+    def step(self, batch: Iterable[Tuple[Hashable, object]]) -> List:
+        """Execute the (key, event) transitions of the batch and return the list of their actions, in batch order.
+
+        Events of the same key are executed in batch order. The entries of the events not allowed in the current
+        state of their instance hold the corresponding IllegalEventError, without stopping the rest of the batch.
+        """
+        self._check_running()
+        shards: List[List] = [[] for _ in range(self.workers)]
+        positions: List[List[int]] = [[] for _ in range(self.workers)]
+        workers = self.workers
+        size = 0
+        for position, item in enumerate(batch):
+            shard = hash(item[0]) % workers
+            shards[shard].append(item)
+            positions[shard].append(position)
+            size += 1
+        for connection, shard in zip(self._connections, shards):
+            connection.send(("step", shard))
+        results = [None] * size
+        for connection, shard_positions in zip(self._connections, positions):
+            for position, result in zip(shard_positions, connection.recv()):
+                results[position] = result
+        return results
+
+    def partition(self, batch: Iterable[Tuple[Hashable, object]]) -> List[Tuple[List[Hashable], array]]:
+        """Split a batch of (key, event) pairs into the (keys, event ids) shards accepted by step_shards.
+
+        A KeyError is raised for the events not declared in the definition, as they have no id."""
+        event_ids = self.definition.table.event_ids
+        workers = self.workers
+        shards = [([], array("i")) for _ in range(workers)]
+        for key, event in batch:
+            keys, events = shards[hash(key) % workers]
+            keys.append(key)
+            events.append(event_ids[event])
+        return shards
+
+    def step_shards(self, shards: Sequence[Tuple[Sequence[Hashable], Sequence[int]]]) -> List[array]:
+        """Execute the transitions of pre-partitioned shards and return, for each shard, the array of action ids.
+
+        The i-th shard is a (keys, event ids) pair, both in the order in which the events are executed, whose keys
+        must all belong to the i-th worker as given by shard_of; event ids are the ones of the definition table.
+        Action ids index the actions of the definition table, and are MISSING for the events not allowed in the
+        current state of their instance. Event ids are shipped as arrays, and so can be keys when they are integers.
+        """
+        self._check_running()
+        if len(shards) != self.workers:
+            raise ValueError(f"Expected {self.workers} shards, got {len(shards)}")
+        for connection, (keys, event_ids) in zip(self._connections, shards):
+            if not isinstance(event_ids, array):
+                event_ids = array("i", event_ids)
+            connection.send(("step_ids", (keys, event_ids)))
+        return [connection.recv() for connection in self._connections]
+
+    def snapshot(self) -> Dict[Hashable, str]:
+        """Return the mapping of each key to the name of the current state of its instance."""
+        self._check_running()
+        for connection in self._connections:
+            connection.send(("snapshot", None))
+        snapshot = {}
+        for connection in self._connections:
+            snapshot.update(connection.recv())
+        return snapshot
+
+    def restore(self, snapshot: Dict[Hashable, str]):
+        """Place the instances of the keys in the states of a snapshot, possibly taken with a different number of workers.
+
+        A KeyError is raised, before any instance is changed, if the snapshot references undeclared states."""
+        self._check_running()
+        unknown = set(snapshot.values()).difference(self.definition.table.state_ids)
+        if unknown:
+            raise KeyError(f"States {sorted(unknown)} are not declared in {self.definition}")
+        shards: List[Dict[Hashable, str]] = [{} for _ in range(self.workers)]
+        for key, state_name in snapshot.items():
+            shards[self.shard_of(key)][key] = state_name
+        for connection, shard in zip(self._connections, shards):
+            connection.send(("restore", shard))
+        for connection in self._connections:
+            connection.recv()
@@ -0,0 +1,244 @@
+from typing import Dict, Hashable, List, Optional, Tuple, TypeVar
+
+import json
+import mmap
+import struct
+import sys
+import threading
+
+from pyautomaton.automaton import IllegalEventError
+from pyautomaton.compiled import MISSING, TransitionTable
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None
+
+TSharedDefinition = TypeVar("TSharedDefinition", bound="SharedDefinition")
+
+_attach_lock = threading.Lock()
+
+MAGIC = b"PYAS"
+LAYOUT_VERSION = 1
+
+# magic, layout version, number of states, events and actions, initial state id
+_HEADER = struct.Struct("<4sIIIII")
+_OFFSET = struct.Struct("<I")
+
+
+def _attach(name: str):
+    """Attach to an existing shared memory block without registering it with the resource tracker.
+
+    The resource tracker unlinks the blocks registered by a process when it exits, which must only happen for the
+    blocks that process created. Before Python 3.13, attaching always registers the block, so that registration is
+    skipped for the duration of the call."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    tracker = getattr(shared_memory, "resource_tracker", None)
+    if tracker is None:  # pragma: no cover - blocks are not tracked on this platform
+        return shared_memory.SharedMemory(name=name)
+    with _attach_lock:
+        register = tracker.register
+        tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            tracker.register = register
+
+
+class LayoutError(Exception):
+    """This error is thrown when a buffer does not hold a definition in the binary layout of this module."""
+
+
+def _pad(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def _pack_strings(values: List[bytes]) -> bytes:
+    """Return a string table: the n + 1 uint32 offsets of the values in the blob, followed by the padded blob."""
+    offsets = [0]
+    for value in values:
+        offsets.append(offsets[-1] + len(value))
+    blob = b"".join(values)
+    return struct.pack(f"<{len(offsets)}I", *offsets) + blob + bytes(_pad(len(blob)) - len(blob))
+
+
+def pack(automaton) -> bytes:
+    """Return the binary layout of an Automaton or of an AutomatonDefinition.
+
+    The layout is made of a header, four string tables (the name and version of the automaton, then the state names,
+    the events and the actions, the last three encoded in json) and two int32 matrices of size (number of states *
+    number of events) holding the next state and action ids, MISSING where the event is not allowed."""
+    table = getattr(automaton, "table", None)
+    if not isinstance(table, TransitionTable):
+        table = TransitionTable.from_automaton(automaton)
+    parts = [
+        _HEADER.pack(MAGIC, LAYOUT_VERSION, table.n_states, table.n_events, len(table.actions), table.initial_state),
+        _pack_strings([json.dumps(automaton.name).encode("utf-8"), json.dumps(automaton.version).encode("utf-8")]),
+        _pack_strings([name.encode("utf-8") for name in table.state_names]),
+        _pack_strings([json.dumps(event).encode("utf-8") for event in table.events]),
+        _pack_strings([json.dumps(action).encode("utf-8") for action in table.actions]),
+        struct.pack(f"<{len(table.next_states)}i", *table.next_states),
+        struct.pack(f"<{len(table.action_ids)}i", *table.action_ids),
+    ]
+    return b"".join(parts)
+
+
+def write(automaton, path: str):
+    """Write the binary layout of an Automaton or of an AutomatonDefinition to the given file."""
+    with open(path, "wb") as f:
+        f.write(pack(automaton))
+
+
+def share(automaton, name: Optional[str] = None):
+    """Copy the binary layout of an Automaton or of an AutomatonDefinition to a new shared memory block.
+
+    The multiprocessing.shared_memory.SharedMemory block is returned, the caller is in charge of unlinking it."""
+    data = pack(automaton)
+    block = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    block.buf[: len(data)] = data
+    return block
+
+
+class SharedDefinition:
+    """
+    Read only state machine definition backed by a buffer holding the binary layout produced by pack.
+
+    The transition matrices are never copied: steppers read them straight from the buffer, so that a definition
+    mapped from a file or from a shared memory block is shared by all the processes mapping it. Events and actions
+    are decoded when the definition is opened, state names only when needed.
+    """
+
+    def __init__(self, buffer, owner=None) -> None:
+        view = memoryview(buffer).cast("B")
+        if len(view) < _HEADER.size:
+            raise LayoutError("Buffer too small to hold a definition")
+        magic, layout_version, n_states, n_events, n_actions, initial_state = _HEADER.unpack_from(view)
+        if magic != MAGIC or layout_version != LAYOUT_VERSION:
+            raise LayoutError(f"Unsupported layout {magic!r} v{layout_version}")
+        self._view = view
+        self._owner = owner
+        offset = _HEADER.size
+        (name, version), offset = self._decode_table(offset, 2, json.loads)
+        self.name = name
+        self.version = version
+        self._state_offsets = offset
+        self._state_blob = offset + _OFFSET.size * (n_states + 1)
+        (blob_size,) = _OFFSET.unpack_from(view, self._state_blob - _OFFSET.size)
+        offset = self._state_blob + _pad(blob_size)
+        events, offset = self._decode_table(offset, n_events, json.loads)
+        self.actions, offset = self._decode_table(offset, n_actions, json.loads)
+        self.event_ids: Dict[Hashable, int] = {event: i for i, event in enumerate(events)}
+        self.events = tuple(events)
+        size = n_states * n_events * 4
+        self.next_states = view[offset : offset + size].cast("i")
+        self.action_ids = view[offset + size : offset + 2 * size].cast("i")
+        self.n_states = n_states
+        self.n_events = n_events
+        self.initial_state = initial_state
+        self._state_ids: Optional[Dict[str, int]] = None
+
+    def _decode_table(self, offset: int, count: int, decode) -> Tuple[Tuple, int]:
+        """Decode the string table at offset, returning its values and the offset following it."""
+        offsets = struct.unpack_from(f"<{count + 1}I", self._view, offset)
+        blob = offset + _OFFSET.size * (count + 1)
+        values = tuple(decode(bytes(self._view[blob + offsets[i] : blob + offsets[i + 1]])) for i in range(count))
+        return values, blob + _pad(offsets[-1])
+
+    @classmethod
+    def from_file(cls, path: str) -> TSharedDefinition:
+        """Return the definition held by the given file, mapped in memory."""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, data)
+
+    @classmethod
+    def from_shared_memory(cls, name: str) -> TSharedDefinition:
+        """Return the definition held by the shared memory block with the given name, created through share.
+
+        The block is not unlinked when the definition is closed nor when the process exits: its creator is in charge
+        of unlinking it."""
+        block = _attach(name)
+        return cls(block.buf, block)
+
+    def close(self):
+        """Release the buffer, closing the mapped file or shared memory block the definition has been opened from.
+
+        Steppers of the definition must not be used afterwards."""
+        self.next_states.release()
+        self.action_ids.release()
+        self._view.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def state_name(self, state_id: int) -> str:
+        """Return the name of the state with the given id."""
+        if not 0 <= state_id < self.n_states:
+            raise IndexError(state_id)
+        start, end = struct.unpack_from("<2I", self._view, self._state_offsets + _OFFSET.size * state_id)
+        return str(self._view[self._state_blob + start : self._state_blob + end], "utf-8")
+
+    @property
+    def state_ids(self) -> Dict[str, int]:
+        """Return the mapping of the state names to their ids, built on first use."""
+        if self._state_ids is None:
+            self._state_ids = {self.state_name(i): i for i in range(self.n_states)}
+        return self._state_ids
+
+    def new_stepper(self, state_name: Optional[str] = None):
+        """Return a new stepper of the state machine, placed in the given state or in the initial one."""
+        return SharedStepper(self, None if state_name is None else self.state_ids[state_name])
+
+    def __repr__(self):
+        return f"SharedDefinition: {self.name} v{self.version}"
+
+
+class SharedStepper:
+    """State machine stepping against the transition matrices of a SharedDefinition."""
+
+    __slots__ = ("definition", "_current")
+
+    def __init__(self, definition: SharedDefinition, current_state: Optional[int] = None) -> None:
+        self.definition = definition
+        self._current = definition.initial_state if current_state is None else current_state
+
+    def get_initial_state(self) -> str:
+        """Return the name of the initial state."""
+        return self.definition.state_name(self.definition.initial_state)
+
+    def get_current_state(self) -> str:
+        """Return the name of the current state."""
+        return self.definition.state_name(self._current)
+
+    def set_current_state(self, state_name: str):
+        """Set the current state of the state machine"""
+        self._current = self.definition.state_ids[state_name]
+
+    def __call__(self, event):
+        """Execute the state transition binded with the given event.
+
+        The action associated with the executed transition is returned and the current state is updated.
+        An IllegalEventError is raised if the event is not allowed in the current state.
+        """
+        definition = self.definition
+        event_id = definition.event_ids.get(event)
+        if event_id is None:
+            raise IllegalEventError(self.get_current_state(), event)
+        return definition.actions[self.step(event_id)]
+
+    def step(self, event_id: int) -> int:
+        """Execute the state transition binded with the given event id and return the id of the action."""
+        definition = self.definition
+        index = self._current * definition.n_events + event_id
+        next_state = definition.next_states[index]
+        if next_state == MISSING:
+            raise IllegalEventError(self.get_current_state(), definition.events[event_id])
+        self._current = next_state
+        return definition.action_ids[index]
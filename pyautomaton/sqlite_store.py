@@ -0,0 +1,261 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import queue
+import sqlite3
+import threading
+
+from pyautomaton.automaton import Automaton
+from pyautomaton.definition import AutomatonDefinition, AutomatonInstance, UnknownDefinitionError, _DefinitionCache
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS definitions (
+        id INTEGER PRIMARY KEY,
+        fingerprint TEXT NOT NULL UNIQUE,
+        name TEXT,
+        version INTEGER,
+        dump TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS instances (
+        key TEXT PRIMARY KEY,
+        definition INTEGER NOT NULL REFERENCES definitions (id),
+        state TEXT NOT NULL
+    ) WITHOUT ROWID""",
+)
+
+
+class _ConnectionPool:
+    """Fixed size pool of connections to a database file, each used by a single thread at a time."""
+
+    def __init__(self, path: str, size: int) -> None:
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(size):
+            connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connections.put(connection)
+        self.size = size
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, waiting for one to be returned if they are all in use."""
+        connection = self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection and run the statements executed on it in a single transaction."""
+        with self.connection() as connection:
+            connection.execute("BEGIN")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def close(self):
+        for _ in range(self.size):
+            self._connections.get().close()
+
+
+class _LRUCache:
+    """Thread safe mapping holding at most capacity entries, evicting the least recently used one."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, AutomatonInstance]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[AutomatonInstance]:
+        with self._lock:
+            instance = self._entries.get(key)
+            if instance is not None:
+                self._entries.move_to_end(key)
+            return instance
+
+    def put(self, key: str, instance: AutomatonInstance):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = instance
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """
+    Store of automaton instances in a local SQLite database.
+
+    Definitions are saved once, as the dump produced by AutomatonDefinition.dump along with their name and version,
+    and each instance is saved as a (key, definition, current state name) row. Automaton objects are saved through the
+    definition built from them, and instances are always loaded as AutomatonInstance objects.
+
+    The store can be shared between threads: each operation borrows a connection from a pool of pool_size
+    connections, and the last cache_size instances saved or loaded are kept in memory. Cached instances are the very
+    objects returned by get, so changes made to them must still be saved to be persisted.
+
+    A path of ":memory:" keeps the database in memory for the lifetime of the store. Each connection to ":memory:"
+    opens a database of its own, so the pool then holds a single connection whatever pool_size.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, cache_size: int = 10_000) -> None:
+        self.path = path
+        if path == ":memory:":
+            pool_size = 1
+        self._pool = _ConnectionPool(path, pool_size)
+        self._cache = _LRUCache(cache_size)
+        self._lock = threading.Lock()
+        self._definitions: Dict[int, AutomatonDefinition] = {}
+        self._definition_ids: Dict[str, int] = {}
+        with self._pool.transaction() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    def close(self):
+        """Close all the connections of the store."""
+        self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def save_definition(self, definition: AutomatonDefinition) -> int:
+        """Save the definition, unless already saved, and return its id in the store."""
+        definition_id = self._definition_ids.get(definition.fingerprint)
+        if definition_id is not None:
+            return definition_id
+        with self._lock, self._pool.transaction() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO definitions (fingerprint, name, version, dump) VALUES (?, ?, ?, ?)",
+                (definition.fingerprint, definition.name, definition.version, AutomatonDefinition.dump(definition)),
+            )
+            (definition_id,) = connection.execute(
+                "SELECT id FROM definitions WHERE fingerprint = ?", (definition.fingerprint,)
+            ).fetchone()
+            self._definitions.setdefault(definition_id, definition)
+            self._definition_ids[definition.fingerprint] = definition_id
+        return definition_id
+
+    def definition(self, fingerprint: str) -> AutomatonDefinition:
+        """Return the saved definition with the given fingerprint, raising UnknownDefinitionError if there is none."""
+        definition_id = self._definition_ids.get(fingerprint)
+        if definition_id is None:
+            with self._pool.connection() as connection:
+                row = connection.execute("SELECT id FROM definitions WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if row is None:
+                raise UnknownDefinitionError(fingerprint)
+            definition_id = row[0]
+        return self._definition(definition_id)
+
+    def _definition(self, definition_id: int) -> AutomatonDefinition:
+        definition = self._definitions.get(definition_id)
+        if definition is None:
+            with self._pool.connection() as connection:
+                fingerprint, dump = connection.execute(
+                    "SELECT fingerprint, dump FROM definitions WHERE id = ?", (definition_id,)
+                ).fetchone()
+            loaded = AutomatonDefinition.load(dump)
+            with self._lock:
+                definition = self._definitions.setdefault(definition_id, loaded)
+                self._definition_ids[fingerprint] = definition_id
+        return definition
+
+    def _row(
+        self, key: str, instance: Union[Automaton, AutomatonInstance], definitions: _DefinitionCache
+    ) -> Tuple[str, int, str]:
+        definition = instance.definition if isinstance(instance, AutomatonInstance) else definitions.get(instance)
+        return key, self.save_definition(definition), instance.get_current_state().name
+
+    def save(self, key: str, instance: Union[Automaton, AutomatonInstance]):
+        """Save the current state of the instance under the given key."""
+        self.save_many([(key, instance)])
+
+    def save_many(self, items: Iterable[Tuple[str, Union[Automaton, AutomatonInstance]]]):
+        """Save the current state of each (key, instance) pair in a single transaction.
+
+        The definition of each Automaton object is built once per call, however many times the object is saved."""
+        rows = []
+        cached = []
+        definitions = _DefinitionCache()
+        for key, instance in items:
+            rows.append(self._row(key, instance, definitions))
+            if isinstance(instance, AutomatonInstance):
+                cached.append((key, instance))
+        with self._pool.transaction() as connection:
+            connection.executemany("INSERT OR REPLACE INTO instances (key, definition, state) VALUES (?, ?, ?)", rows)
+        self._cache.discard(row[0] for row in rows)
+        for key, instance in cached:
+            self._cache.put(key, instance)
+
+    def _instance(self, key: str, definition_id: int, state: str) -> AutomatonInstance:
+        definition = self._definition(definition_id)
+        instance = AutomatonInstance(definition, definition.table.state_ids[state])
+        self._cache.put(key, instance)
+        return instance
+
+    def get(self, key: str) -> AutomatonInstance:
+        """Return the instance saved under the given key, raising KeyError if there is none."""
+        instance = self._cache.get(key)
+        if instance is not None:
+            return instance
+        with self._pool.connection() as connection:
+            row = connection.execute("SELECT definition, state FROM instances WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._instance(key, *row)
+
+    def load_range(
+        self, start: Optional[str] = None, stop: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Tuple[str, AutomatonInstance]]:
+        """Return the (key, instance) pairs whose key is in [start, stop), in key order, up to limit pairs.
+
+        Unset bounds are unbounded. Instances held by the cache are returned in place of the saved ones."""
+        query = "SELECT key, definition, state FROM instances WHERE key >= ?"
+        parameters: list = ["" if start is None else start]
+        if stop is not None:
+            query += " AND key < ?"
+            parameters.append(stop)
+        query += " ORDER BY key"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        with self._pool.connection() as connection:
+            rows = connection.execute(query, parameters).fetchall()
+        result = []
+        for key, definition_id, state in rows:
+            instance = self._cache.get(key)
+            result.append((key, instance if instance is not None else self._instance(key, definition_id, state)))
+        return result
+
+    def delete_many(self, keys: Iterable[str]):
+        """Delete the instances saved under the given keys, ignoring the missing ones."""
+        keys = list(keys)
+        with self._pool.transaction() as connection:
+            connection.executemany("DELETE FROM instances WHERE key = ?", ((key,) for key in keys))
+        self._cache.discard(keys)
+
+    def __contains__(self, key: str):
+        """Returns true if an instance is saved under the given key."""
+        with self._pool.connection() as connection:
+            return connection.execute("SELECT 1 FROM instances WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        """Return the number of saved instances."""
+        with self._pool.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM instances").fetchone()[0]
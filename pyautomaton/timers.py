@@ -0,0 +1,165 @@
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import heapq
+import itertools
+import time
+
+from pyautomaton.definition import AutomatonDefinition, AutomatonInstance
+
+
+class TimerScheduler:
+    """
+    Heap of timers, at most one pending per key, fired in deadline order.
+
+    Each timer is identified by a sequence number: scheduling or cancelling the timer of a key only replaces or drops
+    its pending entry, in constant time, and the stale heap entries are skipped when they reach the top of the heap.
+    The heap is rebuilt when stale entries outnumber the pending ones, so that its size stays proportional to the
+    number of pending timers. Expired timers are collected in O(expired * log(pending)) time.
+
+    The clock, time.monotonic by default, can be replaced for deterministic tests.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._pending: Dict[Hashable, Tuple[int, object]] = {}
+        self._sequence = itertools.count()
+
+    def schedule(self, key: Hashable, delay: float, payload=None, now: Optional[float] = None):
+        """Schedule the timer of the key to expire after delay seconds, replacing its pending timer if any."""
+        sequence = next(self._sequence)
+        self._pending[key] = (sequence, payload)
+        heapq.heappush(self._heap, ((self.clock() if now is None else now) + delay, sequence, key))
+        if len(self._heap) > 2 * len(self._pending) + 1024:
+            self._compact()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel the pending timer of the key, returning false if there is none."""
+        return self._pending.pop(key, None) is not None
+
+    def _is_stale(self, entry: Tuple[float, int, Hashable]) -> bool:
+        pending = self._pending.get(entry[2])
+        return pending is None or pending[0] != entry[1]
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if not self._is_stale(entry)]
+        heapq.heapify(self._heap)
+
+    def expired(self, now: Optional[float] = None) -> List[Tuple[Hashable, object]]:
+        """Remove and return the (key, payload) pairs of the timers expired at now, the current time by default."""
+        if now is None:
+            now = self.clock()
+        heap = self._heap
+        pending = self._pending
+        expired = []
+        while heap and heap[0][0] <= now:
+            _, sequence, key = heapq.heappop(heap)
+            entry = pending.get(key)
+            if entry is not None and entry[0] == sequence:
+                del pending[key]
+                expired.append((key, entry[1]))
+        return expired
+
+    def next_deadline(self) -> Optional[float]:
+        """Return the deadline of the next pending timer, or None if there is none."""
+        heap = self._heap
+        while heap and self._is_stale(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def __contains__(self, key: Hashable):
+        """Returns true if a timer is pending for the key."""
+        return key in self._pending
+
+    def __len__(self):
+        """Return the number of pending timers."""
+        return len(self._pending)
+
+
+class TimeoutService:
+    """
+    Instances of a definition, indexed by key, whose timeout transitions are fired by a TimerScheduler.
+
+    The timer of an instance is restarted each time it receives an event through send, according to the timeout of
+    the state it ends up in, and cancelled if that state declares no timeout. Expired timeouts are fired by poll,
+    which is meant to be called periodically, e.g. sleeping until next_deadline. The handler, if any, is called with
+    the key, event and action of each fired timeout.
+    """
+
+    def __init__(
+        self,
+        definition: AutomatonDefinition,
+        clock: Callable[[], float] = time.monotonic,
+        handler: Optional[Callable[[Hashable, object, object], object]] = None,
+    ) -> None:
+        self.definition = definition
+        self.scheduler = TimerScheduler(clock)
+        self.handler = handler
+        self._instances: Dict[Hashable, AutomatonInstance] = {}
+
+    def _arm(self, key: Hashable, instance: AutomatonInstance, now: Optional[float] = None):
+        timeout = self.definition.timeouts.get(instance.get_current_state().name)
+        if timeout is None:
+            self.scheduler.cancel(key)
+        else:
+            self.scheduler.schedule(key, timeout.seconds, timeout.event, now)
+
+    def add(self, key: Hashable, instance: Optional[AutomatonInstance] = None) -> AutomatonInstance:
+        """Add the instance, a new one in the initial state by default, starting the timer of its current state."""
+        if instance is None:
+            instance = self.definition.new_instance()
+        self._instances[key] = instance
+        self._arm(key, instance)
+        return instance
+
+    def remove(self, key: Hashable) -> AutomatonInstance:
+        """Remove the instance of the key, cancelling its timer."""
+        self.scheduler.cancel(key)
+        return self._instances.pop(key)
+
+    def instance(self, key: Hashable) -> AutomatonInstance:
+        """Return the instance of the key."""
+        return self._instances[key]
+
+    def send(self, key: Hashable, event):
+        """Send the event to the instance of the key, restart its timer and return the action of the transition."""
+        instance = self._instances[key]
+        action = instance(event)
+        self._arm(key, instance)
+        return action
+
+    def poll(self, now: Optional[float] = None) -> List[Tuple[Hashable, object, object]]:
+        """Fire the timeouts expired at now, the current time by default, and return their (key, event, action).
+
+        Every expired timeout is fired even if the handler raises: the first exception raised by the handler is
+        re-raised once all of them have been fired."""
+        if now is None:
+            now = self.scheduler.clock()
+        fired = []
+        error: Optional[BaseException] = None
+        for key, event in self.scheduler.expired(now):
+            instance = self._instances[key]
+            action = instance(event)
+            self._arm(key, instance, now)
+            fired.append((key, event, action))
+            if self.handler is not None:
+                try:
+                    self.handler(key, event, action)
+                except Exception as e:
+                    if error is None:
+                        error = e
+        if error is not None:
+            raise error
+        return fired
+
+    def next_deadline(self) -> Optional[float]:
+        """Return the time at which the next timeout expires, or None if no timer is pending."""
+        return self.scheduler.next_deadline()
+
+    def __contains__(self, key: Hashable):
+        """Returns true if an instance has been added with the key."""
+        return key in self._instances
+
+    def __len__(self):
+        """Return the number of instances."""
+        return len(self._instances)
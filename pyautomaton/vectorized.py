@@ -0,0 +1,61 @@
+from typing import Hashable, Iterable, Tuple, TypeVar
+
+from pyautomaton.compiled import MISSING, TransitionTable
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional extra
+    np = None
+
+TBatchStepper = TypeVar("TBatchStepper", bound="BatchStepper")
+
+
+class BatchStepper:
+    """
+    Apply one event to each machine of a fleet of identical state machines in a single vectorized step.
+
+    Machines are represented by the ids of their current states and events by their ids, as interned by the
+    TransitionTable the stepper is built from. NumPy is required: install pyautomaton with the "numpy" extra.
+    """
+
+    def __init__(self, table: TransitionTable) -> None:
+        if np is None:
+            raise ImportError("BatchStepper requires numpy, install pyautomaton[numpy]")
+        self.table = table
+        self.next_states = np.asarray(table.next_states, dtype=np.intp).reshape(table.n_states, table.n_events)
+        self.action_ids = np.asarray(table.action_ids, dtype=np.intp).reshape(table.n_states, table.n_events)
+
+    @classmethod
+    def from_automaton(cls, automaton) -> TBatchStepper:
+        """Build the stepper from the states declared on an Automaton."""
+        return cls(TransitionTable.from_automaton(automaton))
+
+    def state_ids(self, state_names: Iterable[str]):
+        """Return the array of the ids of the given state names."""
+        ids = self.table.state_ids
+        return np.fromiter((ids[name] for name in state_names), dtype=np.intp)
+
+    def event_ids(self, events: Iterable[Hashable]):
+        """Return the array of the ids of the given events."""
+        ids = self.table.event_ids
+        return np.fromiter((ids[event] for event in events), dtype=np.intp)
+
+    def step(self, states, events) -> Tuple:
+        """Execute, for each machine, the transition binded with its event.
+
+        Return the tuple (next states, action ids, illegal mask). Where the mask is set the event is not allowed in
+        the state of the machine: its state is left unchanged and its action id is MISSING.
+        """
+        states = np.asarray(states, dtype=np.intp)
+        events = np.asarray(events, dtype=np.intp)
+        next_states = self.next_states[states, events]
+        action_ids = self.action_ids[states, events]
+        illegal = next_states == MISSING
+        if illegal.any():
+            next_states = np.where(illegal, states, next_states)
+        return next_states, action_ids, illegal
+
+    def actions(self, action_ids) -> list:
+        """Return the actions identified by the given ids, with None in place of MISSING ids."""
+        actions = self.table.actions
+        return [None if i == MISSING else actions[i] for i in np.asarray(action_ids).tolist()]
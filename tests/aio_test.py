@@ -0,0 +1,114 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+from pyautomaton.aio import AsyncRuntime
+from pyautomaton.automaton import IllegalEventError
+from tests.helpers import turnstile
+
+
+class AsyncRuntimeTestCase(IsolatedAsyncioTestCase):
+    async def test_send(self):
+        runtime = AsyncRuntime(turnstile().define())
+        self.assertEqual("unlock", await runtime.send("gate-1", "coin"))
+        self.assertEqual("unlocked", runtime.instance("gate-1").get_current_state().name)
+        self.assertEqual("locked", runtime.instance("gate-2").get_current_state().name)
+        self.assertEqual(2, len(runtime))
+
+    async def test_illegal_event(self):
+        runtime = AsyncRuntime(turnstile().define())
+        with self.assertRaises(IllegalEventError):
+            await runtime.send("gate-1", "kick")
+        self.assertEqual("unlock", await runtime.send("gate-1", "coin"))
+
+    async def test_events_are_ordered_per_key(self):
+        processed = []
+
+        async def handler(key, action):
+            await asyncio.sleep(0.001 if key == "slow" else 0)
+            processed.append((key, action))
+            return action
+
+        runtime = AsyncRuntime(turnstile().define(), handler=handler)
+        events = ["coin", "push", "coin", "push"]
+        results = await asyncio.gather(
+            *[runtime.send(key, event) for event in events for key in ("slow", "fast")]
+        )
+        self.assertEqual(["unlock", "unlock", "lock", "lock"] * 2, results)
+        for key in ("slow", "fast"):
+            self.assertEqual(["unlock", "lock"] * 2, [a for k, a in processed if k == key])
+        self.assertEqual("fast", processed[0][0])
+
+    async def test_backpressure(self):
+        release = asyncio.Event()
+
+        async def handler(key, action):
+            await release.wait()
+            return action
+
+        runtime = AsyncRuntime(turnstile().define(), handler=handler, maxsize=1)
+        first = await runtime.submit("gate", "coin")
+        await asyncio.sleep(0)
+        second = await runtime.submit("gate", "push")
+        blocked = asyncio.ensure_future(runtime.submit("gate", "coin"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+
+        release.set()
+        third = await blocked
+        await runtime.join()
+        self.assertEqual(["unlock", "lock", "unlock"], [first.result(), second.result(), third.result()])
+
+    async def test_cancelled_worker_cancels_pending_events(self):
+        async def handler(key, action):
+            await asyncio.Event().wait()
+
+        runtime = AsyncRuntime(turnstile().define(), handler=handler)
+        futures = [await runtime.submit("gate", event) for event in ("coin", "push", "coin")]
+        await asyncio.sleep(0)
+        runtime._slots["gate"].worker.cancel()
+        await asyncio.wait_for(runtime.join(), 1)
+        self.assertTrue(all(future.cancelled() for future in futures))
+        self.assertEqual("unlocked", runtime.instance("gate").get_current_state().name)
+
+        runtime.handler = None
+        self.assertEqual("lock", await runtime.send("gate", "push"))
+
+    async def test_cancelled_join_keeps_workers(self):
+        release = asyncio.Event()
+
+        async def handler(key, action):
+            await release.wait()
+            return action
+
+        runtime = AsyncRuntime(turnstile().define(), handler=handler)
+        future = await runtime.submit("gate", "coin")
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(runtime.join(), 0.01)
+        release.set()
+        self.assertEqual("unlock", await future)
+
+    async def test_evict_idle(self):
+        runtime = AsyncRuntime(turnstile().define())
+        await runtime.send("gate-1", "coin")
+        runtime.instance("gate-2")
+        evicted = runtime.evict_idle(lambda key, instance: instance.get_current_state().name == "locked")
+        self.assertEqual(["gate-2"], list(evicted))
+        self.assertEqual(["gate-1"], list(runtime.evict_idle()))
+        self.assertEqual(0, len(runtime))
+
+        runtime.add("gate-1", evicted["gate-2"])
+        self.assertEqual("unlock", await runtime.send("gate-1", "coin"))
+
+    async def test_worker_cancelled_before_running(self):
+        runtime = AsyncRuntime(turnstile().define())
+        future = await runtime.submit("gate", "coin")
+        runtime._slots["gate"].worker.cancel()
+        await asyncio.wait_for(runtime.join(), 1)
+        self.assertTrue(future.cancelled())
+        self.assertEqual("locked", runtime.instance("gate").get_current_state().name)
+
+        # Events sent before the cancelled worker is cleaned up are processed by the next worker.
+        future = await runtime.submit("gate", "coin")
+        runtime._slots["gate"].worker.cancel()
+        self.assertIsNone(await asyncio.wait_for(runtime.send("gate", "coin"), 1))
+        self.assertEqual("unlock", future.result())
+        await asyncio.wait_for(runtime.join(), 1)
@@ -1,6 +1,6 @@
 import json
 from unittest import TestCase
-from pyautomaton.automaton import Automaton, State, IllegalEventError
+from pyautomaton.automaton import Automaton, State, IllegalEventError, FrozenConfigurationError
 
 
 class StatesTestCase(TestCase):
@@ -90,6 +90,48 @@ class StatesTestCase(TestCase):
         state_b = State("state_a").when("E1").do("B1").when("E2").do("B2").go_in(state_c2)
         self.assertNotEqual(state_a, state_b, "Should fail because of different target states")
 
+    def test_state_comparison_deep_graph(self):
+        def chain(last_action):
+            states = [State(f"s{i}") for i in range(5000)]
+            for state, target in zip(states, states[1:]):
+                state.when("E1").go_in(target)
+            states[-1].when("E1").do(last_action)
+            return states[0]
+
+        self.assertEqual(chain("B1"), chain("B1"))
+        self.assertNotEqual(chain("B1"), chain("B2"))
+
+    def test_frozen_state_hash(self):
+        state_a = State("state_a").when("E1").do("B1").when("E2").do("B2")
+        state_b = State("state_a").when("E2").do("B2").when("E1").do("B1")
+        with self.assertRaises(TypeError):
+            hash(state_a)
+        self.assertEqual(state_a.structural_hash(), state_b.structural_hash())
+        state_a.freeze()
+        state_b.freeze()
+        self.assertEqual(hash(state_a), hash(state_b))
+        self.assertEqual(1, len({state_a, state_b}))
+        state_c = State("state_a").when("E1").do("B1").when("E2").do("B3").freeze()
+        self.assertNotEqual(state_a, state_c)
+
+    def test_frozen_state_unhashable_actions(self):
+        def state(action):
+            return State("state_a").when("E1").do(action).when("E2").do("B2").freeze()
+
+        self.assertEqual(state({"notify": "ops"}), state({"notify": "ops"}))
+        self.assertEqual(hash(state({"notify": "ops"})), hash(state({"notify": "ops"})))
+        self.assertNotEqual(state({"notify": "ops"}), state({"notify": "dev"}))
+        self.assertNotEqual(state({"notify": "ops"}), state("B1"))
+
+    def test_frozen_state_configuration(self):
+        target = State("state_b")
+        state = State("state_a").when("E1").go_in(target).freeze()
+        self.assertTrue(target.frozen)
+        with self.assertRaises(FrozenConfigurationError):
+            state.when("E2")
+        with self.assertRaises(FrozenConfigurationError):
+            target.do("B1")
+
     def test_dump_state_no_transitions(self):
         state = State("state_a").when("E1").do("B1").when("E2").do("B2")
         dumped_state = State.dump(state)
@@ -274,3 +316,103 @@ class AutomatonTestCase(TestCase):
         dumped = Automaton.dump(fsm)
         restored = Automaton.load(dumped)
         self.assertEqual(fsm, restored)
+
+    def test_run_yields_actions_lazily(self):
+        fsm = (
+            Automaton()
+            .start_from("locked")
+            .go_in("unlocked")
+            .doing("unlock")
+            .when("coin")
+            .coming_from("unlocked")
+            .go_in("locked")
+            .doing("lock")
+            .when("push")
+        )
+        actions = fsm.run(iter(["coin", "push", "coin"]))
+        self.assertEqual("locked", fsm.get_current_state().name)
+        self.assertEqual("unlock", next(actions))
+        self.assertEqual("unlocked", fsm.get_current_state().name)
+        self.assertEqual(["lock", "unlock"], list(actions))
+        self.assertEqual("unlocked", fsm.get_current_state().name)
+
+    def test_run_illegal_event_position(self):
+        fsm = Automaton().start_from("locked").go_in("unlocked").when("coin")
+        with self.assertRaises(IllegalEventError) as ctx:
+            list(fsm.run(["coin", "coin"]))
+        self.assertEqual(1, ctx.exception.position)
+        self.assertEqual("unlocked", ctx.exception.state)
+        self.assertEqual("unlocked", fsm.get_current_state().name)
+
+    def test_feed(self):
+        fsm = (
+            Automaton()
+            .start_from("locked")
+            .go_in("locked")
+            .when("push")
+            .coming_from("locked")
+            .go_in("unlocked")
+            .doing("unlock")
+            .when("coin")
+            .coming_from("unlocked")
+            .go_in("locked")
+            .doing("lock")
+            .when("push")
+        )
+        events = (event for event in ["push", "coin", "push", "push"])
+        self.assertEqual("locked", fsm.feed(events).name)
+        state, count = fsm.feed(["coin", "push", "coin"], count_actions=True)
+        self.assertEqual("unlocked", state.name)
+        self.assertEqual(3, count)
+        self.assertEqual(state, fsm.get_current_state())
+
+    def test_feed_illegal_event_position(self):
+        fsm = Automaton().start_from("locked").go_in("unlocked").when("coin")
+        with self.assertRaises(IllegalEventError) as ctx:
+            fsm.feed(["coin", "push"])
+        self.assertEqual(1, ctx.exception.position)
+        self.assertEqual("unlocked", fsm.get_current_state().name)
+
+    def test_dump_and_load_deep_automaton(self):
+        fsm = Automaton().start_from("s0")
+        for i in range(5000):
+            fsm.coming_from(f"s{i}").go_in(f"s{i + 1}").doing("next").when("E1")
+        fsm.coming_from("s5000").go_in("s0").when("E1")
+        fsm.feed(["E1"] * 10)
+
+        dumped = Automaton.dump(fsm)
+        restored = Automaton.load(dumped)
+        self.assertEqual(dumped, Automaton.dump(restored))
+        self.assertEqual("s10", restored.get_current_state().name)
+        self.assertEqual(5001, len(json.loads(State.dump(restored.get_initial_state()))))
+
+    def test_frozen_automaton(self):
+        def build():
+            return (
+                Automaton()
+                .start_from("locked")
+                .go_in("unlocked")
+                .when("coin")
+                .coming_from("unlocked")
+                .go_in("locked")
+                .when("push")
+            )
+
+        fsm = build()
+        with self.assertRaises(TypeError):
+            hash(fsm)
+        fsm.freeze()
+        self.assertTrue(fsm.frozen)
+        with self.assertRaises(FrozenConfigurationError):
+            fsm.coming_from("locked")
+        with self.assertRaises(FrozenConfigurationError):
+            fsm.go_in("broken")
+        with self.assertRaises(FrozenConfigurationError):
+            fsm.when("kick")
+
+        other = build().freeze()
+        machines = {fsm: "first"}
+        self.assertEqual("first", machines[other])
+        fsm("coin")
+        self.assertEqual(hash(fsm), hash(other))
+        self.assertNotEqual(fsm, other)
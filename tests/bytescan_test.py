@@ -0,0 +1,65 @@
+import os
+import tempfile
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.bytescan import ByteRecognizer
+
+
+def number_recognizer():
+    fsm = Automaton().start_from("start")
+    for digit in "0123456789":
+        fsm.coming_from("start").go_in("number").when(digit)
+        fsm.coming_from("number").go_in("number").when(digit)
+    return fsm.coming_from("number").go_in("start").when(b" ").coming_from("start").go_in("start").when(32)
+
+
+class ByteRecognizerTestCase(TestCase):
+    def test_final_state(self):
+        recognizer = ByteRecognizer(number_recognizer())
+        self.assertEqual("number", recognizer.final_state(b"12 345"))
+        self.assertEqual("start", recognizer.final_state(bytearray(b"12  ")))
+        self.assertEqual("start", recognizer.final_state(b""))
+        self.assertEqual("start", recognizer.final_state(memoryview(b"1 ")))
+        self.assertEqual("start", recognizer.final_state(b" ", start="number"))
+        self.assertEqual("number", recognizer.final_state(b"7"))
+
+    def test_illegal_byte(self):
+        recognizer = ByteRecognizer(number_recognizer())
+        for scan in (recognizer.final_state, lambda data: recognizer.scan(data, count_visits=True)):
+            with self.assertRaises(IllegalEventError) as ctx:
+                scan(b"12 3x4")
+            self.assertEqual(4, ctx.exception.position)
+            self.assertEqual("number", ctx.exception.state)
+            self.assertEqual(b"x", ctx.exception.event)
+
+    def test_reset(self):
+        recognizer = ByteRecognizer(number_recognizer(), on_missing="reset")
+        result = recognizer.scan(b"a12-3x", accepting=["number"], count_visits=True)
+        self.assertEqual("start", result.final_state)
+        self.assertEqual([1, 2, 4], result.matches)
+        self.assertEqual({"start": 3, "number": 3}, result.visits)
+
+    def test_scan_file(self):
+        recognizer = ByteRecognizer(number_recognizer())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "numbers.txt")
+            with open(path, "wb") as f:
+                f.write(b"1 22 333 ")
+            result = recognizer.scan_file(path, accepting=["start"])
+            self.assertEqual("start", result.final_state)
+            self.assertEqual([1, 4, 8], result.matches)
+            open(path, "wb").close()
+            self.assertEqual("start", recognizer.scan_file(path).final_state)
+
+    def test_events_must_be_bytes(self):
+        with self.assertRaises(ValueError):
+            ByteRecognizer(Automaton().start_from("a").go_in("b").when("push"))
+        with self.assertRaises(ValueError):
+            ByteRecognizer(number_recognizer(), on_missing="ignore")
+
+    def test_conflicting_byte_events(self):
+        fsm = Automaton().start_from("a").coming_from("a").go_in("b").when("A").coming_from("a").go_in("a").when(65)
+        with self.assertRaises(ValueError):
+            ByteRecognizer(fsm)
+        fsm = Automaton().start_from("a").coming_from("a").go_in("b").when("A").coming_from("b").go_in("a").when(b"A")
+        self.assertEqual("b", ByteRecognizer(fsm).scan(b"AAA").final_state)
@@ -0,0 +1,59 @@
+import importlib.util
+import os
+import tempfile
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.codegen import compile_stepper, generate_source, write_module
+from tests import helpers
+
+
+def turnstile():
+    return helpers.turnstile().coming_from("unlocked").go_in("jammed").when("kick")
+
+
+class CodegenTestCase(TestCase):
+    def test_same_behaviour_as_automaton(self):
+        fsm = turnstile()
+        step = compile_stepper(turnstile())
+        for event in ["push", "coin", "coin", "push", "coin", "kick"]:
+            self.assertEqual(fsm(event), step(event))
+            self.assertEqual(fsm.get_current_state().name, step.get_current_state())
+
+    def test_illegal_event(self):
+        step = compile_stepper(turnstile())
+        with self.assertRaises(IllegalEventError) as ctx:
+            step("kick")
+        self.assertEqual("locked", ctx.exception.state)
+        self.assertEqual("locked", step.get_current_state())
+
+    def test_current_state(self):
+        fsm = turnstile()
+        fsm("coin")
+        self.assertEqual("unlocked", compile_stepper(fsm).get_current_state())
+        step = compile_stepper(fsm, "locked")
+        step.set_current_state("unlocked")
+        self.assertEqual("lock", step("push"))
+
+    def test_write_module(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "turnstile_stepper.py")
+            write_module(turnstile(), path)
+            spec = importlib.util.spec_from_file_location("turnstile_stepper", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        self.assertEqual("turnstile", module.NAME)
+        self.assertEqual(("locked", "unlocked", "jammed"), module.STATE_NAMES)
+        step = module.new_stepper()
+        self.assertEqual("unlock", step("coin"))
+        other = module.new_stepper("unlocked")
+        self.assertEqual("lock", other("push"))
+        self.assertEqual("unlocked", step.get_current_state())
+        self.assertEqual("locked", other.get_current_state())
+
+    def test_non_literal_values(self):
+        fsm = Automaton().start_from("a").go_in("b").doing(object()).when("E1")
+        with self.assertRaises(ValueError):
+            generate_source(fsm)
+
+    def test_automaton_generate_source(self):
+        self.assertEqual(generate_source(turnstile()), turnstile().generate_source())
@@ -0,0 +1,76 @@
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, IllegalEventError, State
+from pyautomaton.compact import CompactGraph
+from pyautomaton.compiled import TransitionTable
+from tests.helpers import turnstile
+
+
+class CompactGraphTestCase(TestCase):
+    def test_state_mapping_api(self):
+        graph = turnstile().compact()
+        locked = graph.get_initial_state()
+        self.assertEqual("locked", locked.name)
+        self.assertEqual(2, len(locked))
+        self.assertEqual({"push", "coin"}, set(locked))
+        self.assertIn("coin", locked)
+        self.assertNotIn("kick", locked)
+        self.assertEqual("unlock", locked.get_action("coin"))
+        action, unlocked = locked["coin"]
+        self.assertEqual(("unlock", "unlocked"), (action, unlocked.name))
+        self.assertEqual(graph["unlocked"], unlocked)
+        self.assertEqual(("lock", locked), unlocked["push"])
+        with self.assertRaises(IllegalEventError):
+            locked["kick"]
+        with self.assertRaises(KeyError):
+            locked.get_action("kick")
+
+    def test_same_transitions_as_automaton(self):
+        fsm = turnstile()
+        graph = fsm.compact()
+        self.assertEqual(["locked", "unlocked"], list(graph))
+        self.assertEqual(4, graph.n_transitions)
+        self.assertEqual(set(fsm.get_initial_state().__dict__()), set(graph.rows()))
+        self.assertEqual(
+            TransitionTable.from_automaton(fsm).dispatch[1].keys(),
+            TransitionTable.from_states(graph, "locked").dispatch[1].keys(),
+        )
+
+    def test_load(self):
+        fsm = turnstile()
+        graph = CompactGraph.load(Automaton.dump(fsm))
+        self.assertEqual(("turnstile", 1), (graph.name, graph.version))
+        self.assertEqual(set(fsm.get_initial_state().__dict__()), set(graph.rows()))
+
+    def test_rows(self):
+        graph = CompactGraph.from_rows(
+            [("a", "E2", "B1", "b"), ("a", "E1", None, "a"), ("a", "E2", "B2", "c")], "a", state_names=["z"]
+        )
+        self.assertEqual(["z", "a", "b", "c"], list(graph))
+        self.assertEqual([("a", "E2", "B2", "c"), ("a", "E1", None, "a")], list(graph.rows()))
+        self.assertEqual(0, len(graph["z"]))
+        self.assertEqual("a", graph.get_initial_state().name)
+
+    def test_slotted_states(self):
+        state = State("a").when("E1").do("B1")
+        with self.assertRaises(AttributeError):
+            state.other = 1
+        state.freeze()
+        self.assertIsNone(state._event)
+
+    def test_actions_interning(self):
+        fsm = (
+            Automaton()
+            .start_from("a")
+            .go_in("b")
+            .doing(True)
+            .when("E1")
+            .coming_from("b")
+            .go_in("a")
+            .doing(1)
+            .when("E1")
+        )
+        fsm.coming_from("a").go_in("a").doing({"notify": "ops"}).when("E2")
+        graph = fsm.compact()
+        self.assertIs(True, graph["a"].get_action("E1"))
+        self.assertIs(int, type(graph["b"].get_action("E1")))
+        self.assertEqual({"notify": "ops"}, graph["a"].get_action("E2"))
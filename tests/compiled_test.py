@@ -0,0 +1,87 @@
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.compiled import MISSING, CompiledAutomaton, TransitionTable
+from tests.helpers import turnstile
+
+
+class TransitionTableTestCase(TestCase):
+    def test_interning(self):
+        table = TransitionTable.from_automaton(turnstile())
+        self.assertEqual(("locked", "unlocked"), table.state_names)
+        self.assertEqual(("push", "coin"), table.events)
+        self.assertEqual(0, table.initial_state)
+        locked, unlocked = table.state_ids["locked"], table.state_ids["unlocked"]
+        coin = table.event_ids["coin"]
+        self.assertEqual(unlocked, table.next_state(locked, coin))
+        self.assertEqual("unlock", table.actions[table.action_ids[locked * table.n_events + coin]])
+
+    def test_missing_transitions(self):
+        fsm = Automaton().start_from("a").go_in("b").when("E1").coming_from("b").go_in("a").when("E2")
+        table = TransitionTable.from_automaton(fsm)
+        self.assertEqual(MISSING, table.next_state(table.state_ids["a"], table.event_ids["E2"]))
+        self.assertEqual({"E1"}, set(table.dispatch[table.state_ids["a"]]))
+
+
+class CompiledAutomatonTestCase(TestCase):
+    def test_same_behaviour_as_automaton(self):
+        fsm = turnstile()
+        compiled = fsm.compile()
+        self.assertIsInstance(compiled, CompiledAutomaton)
+        for event in ["push", "coin", "coin", "push", "push", "coin"]:
+            self.assertEqual(fsm(event), compiled(event))
+            self.assertEqual(fsm.get_current_state().name, compiled.get_current_state())
+
+    def test_starts_from_current_state(self):
+        fsm = turnstile()
+        fsm("coin")
+        compiled = fsm.compile()
+        self.assertEqual("unlocked", compiled.get_current_state())
+        self.assertEqual("locked", compiled.get_initial_state())
+
+    def test_illegal_event(self):
+        compiled = turnstile().compile()
+        with self.assertRaises(IllegalEventError) as ctx:
+            compiled("run")
+        self.assertEqual("locked", ctx.exception.state)
+        self.assertEqual("run", ctx.exception.event)
+        self.assertEqual("locked", compiled.get_current_state())
+
+    def test_step_by_id(self):
+        compiled = turnstile().compile()
+        table = compiled.table
+        action_id = compiled.step(table.event_ids["coin"])
+        self.assertEqual("unlock", table.actions[action_id])
+        self.assertEqual("unlocked", compiled.get_current_state())
+
+    def test_set_current_state(self):
+        compiled = turnstile().compile()
+        compiled.set_current_state("unlocked")
+        self.assertEqual("lock", compiled("push"))
+
+    def test_unhashable_actions(self):
+        fsm = Automaton().start_from("a").go_in("b").doing({"notify": "ops"}).when("E1")
+        self.assertEqual({"notify": "ops"}, fsm.compile()("E1"))
+        self.assertEqual({"notify": "ops"}, fsm.define().new_instance()("E1"))
+
+    def test_equal_actions_of_different_types(self):
+        fsm = (
+            Automaton()
+            .start_from("a")
+            .go_in("b")
+            .doing(True)
+            .when("E1")
+            .coming_from("b")
+            .go_in("a")
+            .doing(1)
+            .when("E1")
+        )
+        compiled = fsm.compile()
+        self.assertIs(True, compiled("E1"))
+        action = compiled("E1")
+        self.assertIs(int, type(action))
+        self.assertEqual(1, action)
+
+    def test_equal_hashable_actions_are_interned_once(self):
+        fsm = Automaton().start_from("a").go_in("b").doing(("notify", "ops")).when("E1")
+        fsm.coming_from("b").go_in("a").doing(tuple(["notify", "ops"])).when("E1")
+        self.assertEqual([("notify", "ops")], list(fsm.define().table.actions))
@@ -0,0 +1,141 @@
+import sys
+from unittest import TestCase, mock
+from pyautomaton.automaton import Automaton, IllegalEventError, State
+from pyautomaton.definition import (
+    AutomatonDefinition,
+    AutomatonInstance,
+    DefinitionRegistry,
+    UnknownDefinitionError,
+)
+from tests.helpers import turnstile
+
+
+class AutomatonDefinitionTestCase(TestCase):
+    def test_define(self):
+        fsm = turnstile()
+        definition = fsm.define()
+        self.assertIsInstance(definition, AutomatonDefinition)
+        self.assertEqual("turnstile", definition.name)
+        self.assertEqual(1, definition.version)
+        self.assertEqual("locked", definition.get_initial_state().name)
+        self.assertEqual(fsm.get_initial_state(), definition.get_initial_state())
+
+    def test_define_large_graph(self):
+        fsm = Automaton().start_from("s0")
+        for i in range(5000):
+            fsm.coming_from(f"s{i}").go_in(f"s{(i + 1) % 5000}").when("e0").go_in(f"s{(i + 2) % 5000}").when("e1")
+        definition = fsm.define()
+        self.assertTrue(all(state.frozen for state in definition.states.values()))
+        # Each state is frozen once, rather than once per state it can be reached from.
+        with mock.patch.object(State, "_reset", autospec=True) as reset:
+            fsm.freeze()
+        self.assertEqual(5000, reset.call_count)
+        self.assertTrue(all(state.frozen for state in fsm.states.values()))
+
+    def test_definition_is_isolated_from_builder(self):
+        fsm = turnstile()
+        definition = fsm.define()
+        fsm.coming_from("locked").go_in("broken").when("kick")
+        self.assertNotIn("broken", definition.states)
+        self.assertNotIn("kick", definition.get_initial_state())
+        with self.assertRaises(TypeError):
+            definition.states["broken"] = None
+
+
+class AutomatonInstanceTestCase(TestCase):
+    def test_same_behaviour_as_automaton(self):
+        fsm = turnstile()
+        instance = turnstile().define().new_instance()
+        self.assertIsInstance(instance, AutomatonInstance)
+        for event in ["push", "coin", "coin", "push", "push", "coin"]:
+            self.assertEqual(fsm(event), instance(event))
+            self.assertEqual(fsm.get_current_state(), instance.get_current_state())
+
+    def test_instances_are_independent(self):
+        definition = turnstile().define()
+        first, second = definition.new_instance(), definition.new_instance()
+        self.assertEqual("unlock", first("coin"))
+        self.assertEqual("unlocked", first.get_current_state().name)
+        self.assertEqual("locked", second.get_current_state().name)
+        self.assertIs(first.definition, second.definition)
+
+    def test_set_current_state(self):
+        definition = turnstile().define()
+        instance = definition.new_instance("unlocked")
+        self.assertEqual("unlocked", instance.get_current_state().name)
+        instance.set_current_state("locked")
+        self.assertEqual("unlock", instance("coin"))
+
+    def test_illegal_event(self):
+        instance = turnstile().define().new_instance()
+        with self.assertRaises(IllegalEventError) as ctx:
+            instance("run")
+        self.assertEqual("locked", ctx.exception.state)
+        self.assertEqual("locked", instance.get_current_state().name)
+
+    def test_instance_footprint(self):
+        instance = turnstile().define().new_instance()
+        self.assertFalse(hasattr(instance, "__dict__"))
+        self.assertLess(sys.getsizeof(instance), 64)
+
+
+class SnapshotTestCase(TestCase):
+    def test_fingerprint_is_stable(self):
+        reordered = (
+            Automaton(name="turnstile")
+            .start_from("locked")
+            .coming_from("unlocked")
+            .go_in("locked")
+            .doing("lock")
+            .when("push")
+            .go_in("unlocked")
+            .when("coin")
+            .coming_from("locked")
+            .go_in("unlocked")
+            .doing("unlock")
+            .when("coin")
+            .go_in("locked")
+            .when("push")
+        )
+        self.assertEqual(turnstile().define().fingerprint, reordered.define().fingerprint)
+
+    def test_fingerprint_depends_on_name_and_version(self):
+        fingerprint = turnstile().define().fingerprint
+        fsm = turnstile()
+        fsm.version = 2
+        self.assertNotEqual(fingerprint, fsm.define().fingerprint)
+        fsm = turnstile()
+        fsm.name = "gate"
+        self.assertNotEqual(fingerprint, fsm.define().fingerprint)
+        fsm = turnstile()
+        fsm.coming_from("unlocked").go_in("locked").doing("jam").when("push")
+        self.assertNotEqual(fingerprint, fsm.define().fingerprint)
+
+    def test_dump_and_load_definition(self):
+        definition = turnstile().define()
+        restored = AutomatonDefinition.load(AutomatonDefinition.dump(definition))
+        self.assertEqual(definition.fingerprint, restored.fingerprint)
+        fsm = Automaton.load(AutomatonDefinition.dump(definition))
+        self.assertEqual(definition.get_initial_state(), fsm.get_initial_state())
+
+    def test_dump_and_load_instance(self):
+        registry = DefinitionRegistry()
+        definition = registry.register(turnstile().define())
+        self.assertIs(definition, registry.register(turnstile().define()))
+        self.assertEqual(1, len(registry))
+        instance = definition.new_instance()
+        instance("coin")
+
+        restored = registry.load(AutomatonInstance.dump(instance))
+        self.assertIs(definition, restored.definition)
+        self.assertEqual("unlocked", restored.get_current_state().name)
+
+    def test_load_unknown_definition(self):
+        instance = turnstile().define().new_instance()
+        with self.assertRaises(UnknownDefinitionError):
+            DefinitionRegistry().load(AutomatonInstance.dump(instance))
+
+    def test_definitions_as_keys(self):
+        definitions = {turnstile().define(): "turnstile"}
+        self.assertEqual("turnstile", definitions[turnstile().define()])
+        self.assertTrue(turnstile().define().get_initial_state().frozen)
@@ -0,0 +1,23 @@
+"""Automata shared by the test cases."""
+from pyautomaton.automaton import Automaton
+
+
+def turnstile(name="turnstile", version=1) -> Automaton:
+    """Return the turnstile automaton shown in the README."""
+    return (
+        Automaton(name=name, version=version)
+        .start_from("locked")
+        .go_in("locked")
+        .when("push")
+        .coming_from("locked")
+        .go_in("unlocked")
+        .doing("unlock")
+        .when("coin")
+        .coming_from("unlocked")
+        .go_in("unlocked")
+        .when("coin")
+        .coming_from("unlocked")
+        .go_in("locked")
+        .doing("lock")
+        .when("push")
+    )
@@ -0,0 +1,28 @@
+from unittest import TestCase
+from tests.helpers import turnstile
+
+
+class TransitionIndexTestCase(TestCase):
+    def test_queries(self):
+        index = turnstile().index
+        self.assertEqual(frozenset({"push", "coin"}), index.allowed_events("locked"))
+        self.assertEqual(frozenset({"locked", "unlocked"}), index.sources("coin"))
+        self.assertEqual(frozenset({"locked", "unlocked"}), index.predecessors("unlocked"))
+        self.assertEqual(frozenset(), index.sources("kick"))
+        self.assertEqual(frozenset(), index.allowed_events("broken"))
+
+    def test_index_follows_configuration(self):
+        fsm = turnstile()
+        index = fsm.index
+        self.assertIs(index, fsm.index)
+        fsm.coming_from("unlocked").go_in("broken").when("kick")
+        self.assertEqual(frozenset({"unlocked"}), fsm.index.sources("kick"))
+        self.assertEqual(frozenset({"push", "coin", "kick"}), fsm.index.allowed_events("unlocked"))
+        self.assertEqual(frozenset({"unlocked"}), fsm.index.predecessors("broken"))
+        fsm.coming_from("broken").when("repair").go_in("locked")
+        self.assertEqual(frozenset({"locked", "unlocked", "broken"}), fsm.index.predecessors("locked"))
+
+    def test_definition_index(self):
+        definition = turnstile().define()
+        self.assertIs(definition.index, definition.index)
+        self.assertEqual(frozenset({"locked", "unlocked"}), definition.index.sources("push"))
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+from pyautomaton.journal import JournalMismatchError, TransitionJournal
+from tests.helpers import turnstile
+
+
+class TransitionJournalTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.definition = turnstile().define()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def states(self, instances):
+        return {key: instance.get_current_state().name for key, instance in instances.items()}
+
+    def test_recover(self):
+        with TransitionJournal(self.directory.name, self.definition, fsync_every=2) as journal:
+            journal.append("gate-1", "coin")
+            journal.append("gate-2", "coin")
+            journal.append("gate-2", "push")
+            journal.append("gate-3", "kick")
+            self.assertEqual(
+                {"gate-1": "unlocked", "gate-2": "locked", "gate-3": "locked"},
+                self.states(journal.recover()),
+            )
+
+        with TransitionJournal(self.directory.name, self.definition) as journal:
+            journal.append("gate-1", "push")
+            instances = journal.recover()
+        self.assertEqual({"gate-1": "locked", "gate-2": "locked", "gate-3": "locked"}, self.states(instances))
+        self.assertEqual("unlock", instances["gate-1"]("coin"))
+
+    def test_compact(self):
+        with TransitionJournal(self.directory.name, self.definition) as journal:
+            journal.append("gate-1", "coin")
+            journal.compact()
+            journal.append("gate-2", "coin")
+            journal.compact()
+            journal.append("gate-1", "push")
+        self.assertEqual(["journal-00000002.log", "snapshot.json"], sorted(os.listdir(self.directory.name)))
+
+        with TransitionJournal(self.directory.name, self.definition) as journal:
+            self.assertEqual({"gate-1": "locked", "gate-2": "unlocked"}, self.states(journal.recover()))
+
+    def test_torn_record_is_ignored(self):
+        with TransitionJournal(self.directory.name, self.definition) as journal:
+            journal.append("gate-1", "coin")
+            journal.append("gate-1", "push")
+        path = os.path.join(self.directory.name, "journal-00000000.log")
+        os.truncate(path, os.path.getsize(path) - 1)
+
+        with TransitionJournal(self.directory.name, self.definition) as journal:
+            self.assertEqual({"gate-1": "unlocked"}, self.states(journal.recover()))
+
+    def test_definition_mismatch(self):
+        with TransitionJournal(self.directory.name, self.definition) as journal:
+            journal.append("gate-1", "coin")
+            journal.compact()
+        with TransitionJournal(self.directory.name, turnstile("gate").define()) as journal:
+            with self.assertRaises(JournalMismatchError):
+                journal.recover()
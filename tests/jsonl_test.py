@@ -0,0 +1,80 @@
+import io
+from unittest import TestCase
+from pyautomaton.definition import DefinitionRegistry, UnknownDefinitionError
+from pyautomaton.jsonl import JsonLinesWriter, dump_lines, load_lines
+from tests.helpers import turnstile
+
+
+class JsonLinesTestCase(TestCase):
+    def fleet(self):
+        definition = turnstile().define()
+        unlocked = turnstile()
+        unlocked("coin")
+        return [
+            definition.new_instance(),
+            definition.new_instance("unlocked"),
+            unlocked,
+            turnstile(name="other").define().new_instance(),
+        ]
+
+    def states(self, automata):
+        return [(automaton.definition.name, automaton.get_current_state().name) for automaton in automata]
+
+    def test_definitions_written_once(self):
+        file = io.StringIO()
+        self.assertEqual(4, dump_lines(iter(self.fleet()), file))
+        lines = file.getvalue().splitlines()
+        self.assertEqual(6, len(lines))
+        self.assertEqual(2, sum(1 for line in lines if '"fingerprint"' in line))
+
+    def test_automaton_defined_once(self):
+        fsm = turnstile()
+        calls = []
+        define = fsm.define
+        fsm.define = lambda: calls.append(1) or define()
+        file = io.StringIO()
+        self.assertEqual(100, dump_lines([fsm] * 100, file))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(101, len(file.getvalue().splitlines()))
+
+    def test_round_trip(self):
+        file = io.StringIO()
+        dump_lines(self.fleet(), file)
+        file.seek(0)
+        instances = load_lines(file)
+        self.assertEqual(("turnstile", "locked"), self.states([next(instances)])[0])
+        self.assertEqual(
+            [("turnstile", "unlocked"), ("turnstile", "unlocked"), ("other", "locked")], self.states(instances)
+        )
+
+    def test_shared_definitions(self):
+        file = io.StringIO()
+        dump_lines(self.fleet(), file)
+        file.seek(0)
+        registry = DefinitionRegistry()
+        instances = list(load_lines(file, registry, chunk_size=1))
+        self.assertEqual(2, len(registry))
+        self.assertIs(instances[0].definition, instances[2].definition)
+        self.assertEqual(turnstile().define(), instances[0].definition)
+        self.assertEqual("lock", instances[1]("push"))
+
+    def test_unknown_definition(self):
+        file = io.StringIO()
+        writer = JsonLinesWriter(file)
+        writer.write(turnstile().define().new_instance())
+        writer._written.clear()
+        lines = file.getvalue().splitlines()
+        with self.assertRaises(UnknownDefinitionError):
+            list(load_lines(io.StringIO(lines[1] + "\n")))
+        registry = DefinitionRegistry()
+        registry.register(turnstile().define())
+        self.assertEqual([("turnstile", "locked")], self.states(load_lines(io.StringIO(lines[1] + "\n\n"), registry)))
+
+    def test_parallel_decode(self):
+        file = io.StringIO()
+        dump_lines(self.fleet() * 50, file)
+        expected = self.states(load_lines(io.StringIO(file.getvalue())))
+        file.seek(0)
+        self.assertEqual(200, len(expected))
+        self.assertEqual(expected, self.states(load_lines(file, chunk_size=7, workers=2)))
+        self.assertEqual([], list(load_lines(io.StringIO(""), workers=2)))
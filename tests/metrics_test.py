@@ -0,0 +1,93 @@
+from unittest import TestCase
+from pyautomaton.automaton import IllegalEventError, TransitionListener
+from pyautomaton.metrics import MetricsCollector
+from tests.helpers import turnstile
+
+
+class RecordingListener(TransitionListener):
+    def __init__(self):
+        self.calls = []
+
+    def before_transition(self, automaton, state, event):
+        self.calls.append(("before", state.name, event))
+
+    def after_transition(self, automaton, source, event, action, target):
+        self.calls.append(("after", source.name, event, action, target.name))
+
+    def illegal_event(self, automaton, state, event):
+        self.calls.append(("illegal", state.name, event))
+
+
+class TransitionListenerTestCase(TestCase):
+    def test_notifications(self):
+        listener = RecordingListener()
+        fsm = turnstile().add_listener(listener)
+        self.assertEqual("unlock", fsm("coin"))
+        with self.assertRaises(IllegalEventError):
+            fsm("kick")
+        self.assertEqual(
+            [
+                ("before", "locked", "coin"),
+                ("after", "locked", "coin", "unlock", "unlocked"),
+                ("before", "unlocked", "kick"),
+                ("illegal", "unlocked", "kick"),
+            ],
+            listener.calls,
+        )
+
+    def test_run_and_feed_notify(self):
+        listener = RecordingListener()
+        fsm = turnstile().add_listener(listener)
+        self.assertEqual(["unlock", "lock"], list(fsm.run(["coin", "push"])))
+        state, count = fsm.feed(["coin"], count_actions=True)
+        self.assertEqual("unlocked", state.name)
+        self.assertEqual(1, count)
+        self.assertEqual(6, len(listener.calls))
+        with self.assertRaises(IllegalEventError) as ctx:
+            fsm.feed(["coin", "kick"])
+        self.assertEqual(1, ctx.exception.position)
+
+    def test_remove_listener(self):
+        listener = RecordingListener()
+        fsm = turnstile()
+        fsm.add_listener(listener)
+        fsm.remove_listener(listener)
+        fsm("coin")
+        self.assertEqual([], listener.calls)
+        with self.assertRaises(ValueError):
+            fsm.remove_listener(listener)
+
+
+class MetricsCollectorTestCase(TestCase):
+    def test_snapshot(self):
+        ticks = iter(range(0, 1000, 5))
+        metrics = MetricsCollector(clock=lambda: next(ticks))
+        fsm = turnstile().add_listener(metrics)
+        fsm.feed(["coin", "push", "coin", "coin"])
+        with self.assertRaises(IllegalEventError):
+            fsm("kick")
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            {"locked": {"coin": 2}, "unlocked": {"push": 1, "coin": 1}},
+            snapshot["transitions"],
+        )
+        self.assertEqual({"unlocked": {"kick": 1}}, snapshot["illegal_events"])
+        self.assertEqual({8: 2}, snapshot["latency_ns"]["locked"]["coin"])
+
+        metrics.reset()
+        self.assertEqual({}, metrics.snapshot()["transitions"])
+
+    def test_latency_per_automaton(self):
+        ticks = iter(range(0, 1000, 5))
+        metrics = MetricsCollector(clock=lambda: next(ticks))
+        inner = turnstile().add_listener(metrics)
+
+        class Driver(TransitionListener):
+            def before_transition(self, automaton, state, event):
+                inner.feed(["coin", "push"])
+
+        outer = turnstile().add_listener(metrics).add_listener(Driver())
+        outer("coin")
+        # The outer transition spans the two inner ones.
+        self.assertEqual({8: 1, 32: 1}, metrics.snapshot()["latency_ns"]["locked"]["coin"])
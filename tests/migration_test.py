@@ -0,0 +1,74 @@
+from unittest import TestCase, skipIf
+from pyautomaton.automaton import Automaton
+from pyautomaton.compiled import MISSING
+from pyautomaton.migration import Migration, migrate
+from pyautomaton.vectorized import np
+from tests import helpers
+
+
+def turnstile(version=1):
+    return helpers.turnstile(version=version).coming_from("unlocked").go_in("broken").when("kick")
+
+
+def turnstile_v2():
+    return (
+        Automaton(name="turnstile", version=2)
+        .start_from("closed")
+        .go_in("closed")
+        .when("push")
+        .coming_from("closed")
+        .go_in("open")
+        .doing("unlock")
+        .when("coin")
+        .coming_from("open")
+        .go_in("closed")
+        .doing("lock")
+        .when("push")
+    )
+
+
+class MigrationTestCase(TestCase):
+    def setUp(self):
+        self.old = turnstile().define()
+        self.new = turnstile_v2().define()
+
+    def test_mapping_validation(self):
+        with self.assertRaises(ValueError):
+            Migration(self.old, self.new, {"missing": "closed"})
+        with self.assertRaises(ValueError):
+            Migration(self.old, self.new, {"locked": "missing"})
+        migration = Migration(self.old, self.new, {"locked": "closed", "unlocked": "open"})
+        self.assertEqual(frozenset({"broken"}), migration.unmapped_states)
+        self.assertEqual((0, 1, MISSING), migration.state_map)
+
+    def test_identity_by_default(self):
+        migration = Migration(self.old, turnstile(version=2).define())
+        self.assertEqual(frozenset(), migration.unmapped_states)
+        self.assertEqual([2, 0, 1], migration.remap_ids([2, 0, 1]))
+
+    def test_migrate(self):
+        instances = {
+            "gate-1": self.old.new_instance(),
+            "gate-2": self.old.new_instance("unlocked"),
+            "gate-3": self.old.new_instance("broken"),
+        }
+        held = instances["gate-2"]
+        report = migrate(self.old, self.new, instances, {"locked": "closed", "unlocked": "open"})
+        self.assertEqual(2, report.migrated)
+        self.assertEqual({"gate-3": "broken"}, report.unmapped)
+        self.assertIs(self.new, held.definition)
+        self.assertEqual("open", held.get_current_state().name)
+        self.assertEqual("lock", held("push"))
+        self.assertIs(self.old, instances["gate-3"].definition)
+
+    def test_foreign_instances(self):
+        instances = {"gate-1": self.old.new_instance(), "gate-2": self.new.new_instance()}
+        with self.assertRaises(ValueError):
+            migrate(self.old, self.new, instances, {"locked": "closed"})
+        self.assertIs(self.old, instances["gate-1"].definition)
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_remap_array(self):
+        migration = Migration(self.old, self.new, {"locked": "closed", "unlocked": "open"})
+        remapped = migration.remap_ids(np.array([1, 2, 0, 1]))
+        self.assertEqual([1, MISSING, 0, 1], remapped.tolist())
@@ -0,0 +1,121 @@
+import random
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.minimize import minimize
+
+
+def outputs(fsm, events):
+    results = []
+    for event in events:
+        try:
+            results.append(fsm(event))
+        except IllegalEventError:
+            results.append(IllegalEventError)
+            break
+    return results
+
+
+class MinimizeTestCase(TestCase):
+    def test_merge_equivalent_states(self):
+        fsm = (
+            Automaton(name="turnstile")
+            .start_from("locked")
+            .go_in("unlocked")
+            .doing("unlock")
+            .when("coin")
+            .coming_from("unlocked")
+            .go_in("locked_again")
+            .doing("lock")
+            .when("push")
+            .coming_from("locked_again")
+            .go_in("unlocked")
+            .doing("unlock")
+            .when("coin")
+            .coming_from("unreachable")
+            .go_in("locked")
+            .when("coin")
+        )
+        result = minimize(fsm)
+        self.assertEqual((4, 2, 4, 2), result[1:])
+        minimal = result.automaton
+        self.assertEqual("turnstile", minimal.name)
+        self.assertEqual({"locked", "unlocked"}, set(minimal.states))
+        self.assertEqual(["unlock", "lock", "unlock"], list(minimal.run(["coin", "push", "coin"])))
+        self.assertEqual("locked", fsm.minimize().get_current_state().name)
+
+    def test_actions_distinguish_states(self):
+        fsm = (
+            Automaton()
+            .start_from("a")
+            .go_in("b")
+            .doing("X")
+            .when("E")
+            .coming_from("b")
+            .go_in("c")
+            .doing("X")
+            .when("E")
+            .coming_from("c")
+            .go_in("a")
+            .doing("Y")
+            .when("E")
+        )
+        self.assertEqual(3, len(fsm.minimize().states))
+
+    def test_unhashable_actions(self):
+        notify = {"notify": "ops"}
+        fsm = (
+            Automaton()
+            .start_from("a")
+            .go_in("b")
+            .doing(notify)
+            .when("E")
+            .coming_from("b")
+            .go_in("a")
+            .doing(notify)
+            .when("E")
+            .coming_from("c")
+            .go_in("a")
+            .doing({"notify": "dev"})
+            .when("E")
+        )
+        minimal = fsm.minimize()
+        self.assertEqual({"a"}, set(minimal.states))
+        self.assertEqual([notify, notify], list(minimal.run(["E", "E"])))
+
+    def test_current_state_is_kept(self):
+        fsm = (
+            Automaton()
+            .start_from("a")
+            .go_in("b")
+            .when("E")
+            .coming_from("b")
+            .go_in("c")
+            .doing("X")
+            .when("E")
+            .coming_from("c")
+            .go_in("b")
+            .when("E")
+        )
+        fsm.feed(["E", "E"])
+        minimal = fsm.minimize()
+        self.assertEqual({"a", "b"}, set(minimal.states))
+        self.assertEqual("a", minimal.get_current_state().name)
+
+    def test_same_behaviour_on_random_automata(self):
+        rnd = random.Random(7)
+        for _ in range(50):
+            n_states = rnd.randint(1, 12)
+            fsm = Automaton().start_from("s0")
+            for i in range(n_states):
+                fsm.coming_from(f"s{i}")
+                for event in ("E1", "E2", "E3"):
+                    if rnd.random() < 0.8:
+                        fsm.go_in(f"s{rnd.randrange(n_states)}").doing(rnd.choice(["A", "B"])).when(event)
+            result = minimize(fsm)
+            self.assertLessEqual(result.states_after, result.states_before)
+            for _ in range(20):
+                events = [rnd.choice(["E1", "E2", "E3"]) for _ in range(15)]
+                fsm.set_current_state("s0")
+                result.automaton.set_current_state("s0")
+                self.assertEqual(outputs(fsm, events), outputs(result.automaton, events))
+            self.assertEqual(len(result.automaton.states), len(minimize(result.automaton).automaton.states))
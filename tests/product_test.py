@@ -0,0 +1,59 @@
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.product import ProductAutomaton
+from tests.helpers import turnstile
+
+
+def counter():
+    return (
+        Automaton()
+        .start_from("even")
+        .go_in("odd")
+        .doing("odd")
+        .when("coin")
+        .go_in("even")
+        .when("push")
+        .coming_from("odd")
+        .go_in("even")
+        .doing("even")
+        .when("coin")
+        .go_in("odd")
+        .when("push")
+    )
+
+
+class ProductAutomatonTestCase(TestCase):
+    def test_same_behaviour_as_components(self):
+        first, second = turnstile(), counter()
+        product = ProductAutomaton(turnstile(), counter())
+        self.assertEqual(("locked", "even"), product.get_initial_state())
+        for event in ["coin", "coin", "push", "push", "coin", "push"]:
+            self.assertEqual((first(event), second(event)), product(event))
+            self.assertEqual(
+                (first.get_current_state().name, second.get_current_state().name),
+                product.get_current_state(),
+            )
+
+    def test_illegal_event(self):
+        product = ProductAutomaton(turnstile(), counter().coming_from("odd").go_in("odd").when("kick"))
+        product("coin")
+        with self.assertRaises(IllegalEventError) as ctx:
+            product("kick")
+        self.assertEqual(("unlocked", "odd"), ctx.exception.state)
+        self.assertEqual(("unlocked", "odd"), product.get_current_state())
+
+    def test_lazy_exploration(self):
+        product = ProductAutomaton(turnstile(), counter())
+        self.assertEqual(1, len(product))
+        product("coin")
+        self.assertEqual(2, len(product))
+        self.assertEqual(4, product.explore())
+        product.set_current_state(("unlocked", "even"))
+        self.assertEqual(("lock", None), product("push"))
+
+    def test_starts_from_current_states(self):
+        fsm = turnstile()
+        fsm("coin")
+        product = ProductAutomaton(fsm, counter())
+        self.assertEqual(("unlocked", "even"), product.get_current_state())
+        self.assertEqual(("locked", "even"), product.get_initial_state())
@@ -0,0 +1,65 @@
+from unittest import TestCase
+from pyautomaton.automaton import IllegalEventError
+from pyautomaton.compiled import MISSING
+from pyautomaton.sharded import ShardedExecutor
+from tests.helpers import turnstile
+
+
+class ShardedExecutorTestCase(TestCase):
+    def test_step(self):
+        definition = turnstile().define()
+        batch = [(f"gate-{i % 5}", event) for i, event in enumerate(["coin"] * 5 + ["push"] * 5 + ["kick"])]
+        with ShardedExecutor(definition, workers=2) as executor:
+            results = executor.step(batch)
+            self.assertEqual(["unlock"] * 5 + ["lock"] * 5, results[:10])
+            self.assertIsInstance(results[10], IllegalEventError)
+            self.assertEqual("locked", results[10].state)
+            self.assertEqual(["unlock"], executor.step([("gate-3", "coin")]))
+
+    def test_snapshot_and_restore(self):
+        definition = turnstile().define()
+        with ShardedExecutor(definition, workers=3) as executor:
+            executor.step([(key, "coin") for key in range(10)] + [(key, "push") for key in range(0, 10, 2)])
+            snapshot = executor.snapshot()
+        self.assertEqual({key: "locked" if key % 2 == 0 else "unlocked" for key in range(10)}, snapshot)
+
+        with ShardedExecutor(definition, workers=2) as executor:
+            executor.restore(snapshot)
+            self.assertEqual(snapshot, executor.snapshot())
+            self.assertEqual(["unlock", "lock"], executor.step([(0, "coin"), (1, "push")]))
+            with self.assertRaises(KeyError):
+                executor.restore({0: "broken"})
+
+    def test_step_shards(self):
+        definition = turnstile().coming_from("locked").go_in("jammed").when("kick").define()
+        table = definition.table
+        with ShardedExecutor(definition, workers=2) as executor:
+            batch = [(key, "coin") for key in range(6)] + [(key, "push") for key in range(3)]
+            batch += [(0, "kick"), (0, "coin")]
+            shards = executor.partition(batch)
+            self.assertEqual(2, len(shards))
+            for worker, (keys, _) in enumerate(shards):
+                self.assertTrue(all(executor.shard_of(key) == worker for key in keys))
+            results = executor.step_shards(shards)
+            actions = {}
+            for (keys, _), action_ids in zip(shards, results):
+                for key, action_id in zip(keys, action_ids):
+                    actions.setdefault(key, []).append(MISSING if action_id == MISSING else table.actions[action_id])
+            self.assertEqual(["unlock", "lock", None, MISSING], actions[0])
+            self.assertEqual(["unlock"], actions[5])
+            snapshot = executor.snapshot()
+            self.assertEqual(["jammed", "locked", "unlocked"], [snapshot[0], snapshot[1], snapshot[3]])
+            with self.assertRaises(KeyError):
+                executor.partition([(0, "bang")])
+            with self.assertRaises(ValueError):
+                executor.step_shards(shards[:1])
+
+    def test_not_started(self):
+        executor = ShardedExecutor(turnstile().define(), workers=2)
+        for call in (lambda: executor.step([(0, "coin")]), executor.snapshot, lambda: executor.restore({})):
+            with self.assertRaises(RuntimeError):
+                call()
+        with executor:
+            self.assertEqual(["unlock"], executor.step([(0, "coin")]))
+        with self.assertRaises(RuntimeError):
+            executor.step_shards([([], []), ([], [])])
@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, IllegalEventError
+from pyautomaton.shared import LayoutError, SharedDefinition, pack, share, write
+from tests import helpers
+
+
+def turnstile(name="turnstile"):
+    return helpers.turnstile(name).coming_from("unlocked").go_in("jammed").when("kick")
+
+
+def _run_in_worker(name, events, results):
+    with SharedDefinition.from_shared_memory(name) as definition:
+        stepper = definition.new_stepper()
+        results.put([stepper(event) for event in events] + [stepper.get_current_state()])
+
+
+class SharedDefinitionTestCase(TestCase):
+    EVENTS = ["push", "coin", "coin", "push", "coin", "kick"]
+
+    def test_same_behaviour_as_automaton(self):
+        fsm = turnstile()
+        with SharedDefinition(pack(turnstile())) as definition:
+            stepper = definition.new_stepper()
+            for event in self.EVENTS:
+                self.assertEqual(fsm(event), stepper(event))
+                self.assertEqual(fsm.get_current_state().name, stepper.get_current_state())
+
+    def test_metadata(self):
+        with SharedDefinition(pack(turnstile().define())) as definition:
+            self.assertEqual("turnstile", definition.name)
+            self.assertEqual(1, definition.version)
+            self.assertEqual(3, definition.n_states)
+            self.assertEqual(("push", "coin", "kick"), definition.events)
+            self.assertEqual({"locked": 0, "unlocked": 1, "jammed": 2}, definition.state_ids)
+            self.assertEqual("jammed", definition.state_name(2))
+            with self.assertRaises(IndexError):
+                definition.state_name(3)
+
+    def test_illegal_event(self):
+        with SharedDefinition(pack(turnstile())) as definition:
+            stepper = definition.new_stepper("jammed")
+            for event in ("push", "unknown"):
+                with self.assertRaises(IllegalEventError) as ctx:
+                    stepper(event)
+                self.assertEqual("jammed", ctx.exception.state)
+                self.assertEqual(event, ctx.exception.event)
+
+    def test_non_string_values(self):
+        fsm = Automaton().start_from("a").go_in("b").doing(2).when(1).coming_from("b").go_in("a").when(2.5)
+        with SharedDefinition(pack(fsm)) as definition:
+            stepper = definition.new_stepper()
+            self.assertEqual(2, stepper(1))
+            self.assertIsNone(stepper(2.5))
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "turnstile.bin")
+            write(turnstile(), path)
+            with SharedDefinition.from_file(path) as definition:
+                stepper = definition.new_stepper()
+                self.assertEqual("unlock", stepper("coin"))
+
+    def test_invalid_buffer(self):
+        with self.assertRaises(LayoutError):
+            SharedDefinition(b"not a definition at all")
+
+    def test_shared_memory_across_processes(self):
+        block = share(turnstile())
+        try:
+            results = multiprocessing.get_context("spawn").Queue()
+            worker = multiprocessing.get_context("spawn").Process(
+                target=_run_in_worker, args=(block.name, self.EVENTS, results)
+            )
+            worker.start()
+            fsm = turnstile()
+            self.assertEqual([fsm(event) for event in self.EVENTS] + ["jammed"], results.get(timeout=30))
+            worker.join()
+        finally:
+            block.close()
+            block.unlink()
+
+    def test_shared_memory_outlives_attached_process(self):
+        block = share(turnstile())
+        code = (
+            "import sys\n"
+            "from pyautomaton.shared import SharedDefinition\n"
+            "with SharedDefinition.from_shared_memory(sys.argv[1]) as definition:\n"
+            "    print(definition.new_stepper()('coin'))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        try:
+            worker = subprocess.run(
+                [sys.executable, "-c", code, block.name], cwd=root, capture_output=True, text=True, timeout=60
+            )
+            self.assertEqual("unlock\n", worker.stdout, worker.stderr)
+            self.assertEqual("", worker.stderr)
+            with SharedDefinition.from_shared_memory(block.name) as definition:
+                self.assertEqual("unlock", definition.new_stepper()("coin"))
+        finally:
+            block.close()
+            block.unlink()
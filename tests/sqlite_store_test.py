@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+from pyautomaton.definition import UnknownDefinitionError
+from pyautomaton.sqlite_store import SQLiteStore
+from tests.helpers import turnstile
+
+
+class SQLiteStoreTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fleet.db")
+        self.definition = turnstile().define()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def states(self, pairs):
+        return [(key, instance.get_current_state().name) for key, instance in pairs]
+
+    def test_save_and_load(self):
+        with SQLiteStore(self.path) as store:
+            instances = [(f"gate-{i}", self.definition.new_instance()) for i in range(10)]
+            instances[3][1]("coin")
+            store.save_many(instances)
+            self.assertEqual(10, len(store))
+            self.assertIn("gate-3", store)
+        with SQLiteStore(self.path) as store:
+            instance = store.get("gate-3")
+            self.assertEqual("unlocked", instance.get_current_state().name)
+            self.assertEqual(self.definition.fingerprint, instance.definition.fingerprint)
+            self.assertIs(instance.definition, store.get("gate-4").definition)
+            self.assertEqual("lock", instance("push"))
+            with self.assertRaises(KeyError):
+                store.get("gate-10")
+
+    def test_definitions_are_saved_once(self):
+        with SQLiteStore(self.path) as store:
+            store.save("a", self.definition.new_instance())
+            store.save("b", turnstile().define().new_instance())
+            store.save("c", turnstile(name="other").define().new_instance())
+            with store._pool.connection() as connection:
+                rows = connection.execute("SELECT name, version FROM definitions ORDER BY id").fetchall()
+            self.assertEqual([("turnstile", 1), ("other", 1)], rows)
+            self.assertEqual("turnstile", store.definition(self.definition.fingerprint).name)
+            with self.assertRaises(UnknownDefinitionError):
+                store.definition("missing")
+
+    def test_save_automaton(self):
+        fsm = turnstile()
+        fsm("coin")
+        with SQLiteStore(self.path) as store:
+            store.save("gate", fsm)
+            self.assertEqual("unlocked", store.get("gate").get_current_state().name)
+            self.assertEqual(self.definition, store.get("gate").definition)
+
+    def test_automaton_defined_once_per_batch(self):
+        fsm = turnstile()
+        calls = []
+        define = fsm.define
+        fsm.define = lambda: calls.append(1) or define()
+        with SQLiteStore(self.path) as store:
+            store.save_many((f"gate-{i}", fsm) for i in range(50))
+            self.assertEqual(50, len(store))
+        self.assertEqual(1, len(calls))
+
+    def test_load_range(self):
+        with SQLiteStore(self.path, cache_size=0) as store:
+            store.save_many(
+                (f"gate-{i}", self.definition.new_instance("unlocked" if i % 2 else "locked")) for i in range(10)
+            )
+            self.assertEqual(
+                [("gate-3", "unlocked"), ("gate-4", "locked"), ("gate-5", "unlocked")],
+                self.states(store.load_range("gate-3", "gate-6")),
+            )
+            self.assertEqual(["gate-8", "gate-9"], [key for key, _ in store.load_range("gate-8")])
+            self.assertEqual(["gate-0", "gate-1"], [key for key, _ in store.load_range(limit=2)])
+            store.delete_many(["gate-0", "gate-1", "missing"])
+            self.assertEqual(8, len(store))
+
+    def test_cache(self):
+        with SQLiteStore(self.path, cache_size=2) as store:
+            store.save_many((f"gate-{i}", self.definition.new_instance()) for i in range(3))
+            self.assertEqual(2, len(store._cache))
+            self.assertIs(store.get("gate-2"), store.get("gate-2"))
+            store.get("gate-0")
+            self.assertIsNone(store._cache.get("gate-1"))
+            store.delete_many(["gate-0"])
+            with self.assertRaises(KeyError):
+                store.get("gate-0")
+
+    def test_in_memory(self):
+        with SQLiteStore(":memory:", pool_size=4, cache_size=0) as store:
+            store.save("gate-1", self.definition.new_instance("unlocked"))
+            self._save_from_threads(store)
+            self.assertEqual(401, len(store))
+            self.assertEqual("unlocked", store.get("gate-1").get_current_state().name)
+
+    def test_threads(self):
+        with SQLiteStore(self.path, pool_size=2) as store:
+            self._save_from_threads(store)
+            self.assertEqual(400, len(store))
+
+    def _save_from_threads(self, store):
+        def save(thread):
+            store.save_many((f"gate-{thread}-{i}", self.definition.new_instance()) for i in range(100))
+
+        threads = [threading.Thread(target=save, args=(thread,)) for thread in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
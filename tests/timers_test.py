@@ -0,0 +1,143 @@
+from unittest import TestCase
+from pyautomaton.automaton import Automaton, MissingStateDeclarationError
+from pyautomaton.definition import AutomatonDefinition
+from pyautomaton.timers import TimeoutService, TimerScheduler
+from tests import helpers
+
+
+def turnstile():
+    return (
+        helpers.turnstile()
+        .coming_from("unlocked")
+        .go_in("locked")
+        .doing("relock")
+        .when("expired")
+        .timeout(30, "expired")
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TimeoutDeclarationTestCase(TestCase):
+    def test_declaration(self):
+        fsm = turnstile()
+        self.assertEqual({"unlocked": (30, "expired")}, fsm.timeouts)
+        with self.assertRaises(MissingStateDeclarationError):
+            Automaton().timeout(1, "expired")
+        with self.assertRaises(ValueError):
+            fsm.timeout(0, "expired")
+
+    def test_dump_and_definition(self):
+        fsm = turnstile()
+        self.assertEqual(fsm.timeouts, Automaton.load(Automaton.dump(fsm)).timeouts)
+        definition = fsm.define()
+        self.assertEqual(fsm.timeouts, dict(definition.timeouts))
+        self.assertEqual(definition, AutomatonDefinition.load(AutomatonDefinition.dump(definition)))
+        self.assertNotEqual(definition.fingerprint, turnstile().timeout(60, "expired").define().fingerprint)
+        with self.assertRaises(ValueError):
+            turnstile().timeout(10, "kick").define()
+
+    def test_minimize_keeps_timeouts(self):
+        fsm = Automaton().start_from("a").go_in("b").when("E1").coming_from("b").go_in("a").when("E1")
+        self.assertEqual(1, len(fsm.minimize().states))
+        fsm.coming_from("b").timeout(5, "E1")
+        minimal = fsm.minimize()
+        self.assertEqual(2, len(minimal.states))
+        self.assertEqual({"b": (5, "E1")}, minimal.timeouts)
+
+
+class TimerSchedulerTestCase(TestCase):
+    def test_expired_in_deadline_order(self):
+        clock = FakeClock()
+        scheduler = TimerScheduler(clock)
+        scheduler.schedule("a", 10, "A")
+        scheduler.schedule("b", 5, "B")
+        scheduler.schedule("c", 20, "C")
+        self.assertEqual(5, scheduler.next_deadline())
+        self.assertEqual([], scheduler.expired())
+        clock.now = 10
+        self.assertEqual([("b", "B"), ("a", "A")], scheduler.expired())
+        self.assertEqual(1, len(scheduler))
+        self.assertEqual([("c", "C")], scheduler.expired(now=100))
+        self.assertIsNone(scheduler.next_deadline())
+
+    def test_cancel_and_reschedule(self):
+        clock = FakeClock()
+        scheduler = TimerScheduler(clock)
+        scheduler.schedule("a", 10, "first")
+        scheduler.schedule("a", 20, "second")
+        scheduler.schedule("b", 5)
+        self.assertTrue(scheduler.cancel("b"))
+        self.assertFalse(scheduler.cancel("b"))
+        self.assertNotIn("b", scheduler)
+        self.assertEqual(20, scheduler.next_deadline())
+        self.assertEqual([("a", "second")], scheduler.expired(now=30))
+
+    def test_compaction(self):
+        scheduler = TimerScheduler(FakeClock())
+        for i in range(5000):
+            scheduler.schedule("a", i)
+        self.assertEqual(1, len(scheduler))
+        self.assertLess(len(scheduler._heap), 2000)
+        self.assertEqual([("a", None)], scheduler.expired(now=5000))
+
+
+class TimeoutServiceTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.fired = []
+        self.service = TimeoutService(turnstile().define(), self.clock, lambda *fired: self.fired.append(fired))
+
+    def test_fire_timeout(self):
+        self.service.add("gate-1")
+        self.service.add("gate-2")
+        self.assertEqual("unlock", self.service.send("gate-1", "coin"))
+        self.assertEqual(30, self.service.next_deadline())
+        self.clock.now = 29
+        self.assertEqual([], self.service.poll())
+        self.clock.now = 30
+        self.assertEqual([("gate-1", "expired", "relock")], self.service.poll())
+        self.assertEqual([("gate-1", "expired", "relock")], self.fired)
+        self.assertEqual("locked", self.service.instance("gate-1").get_current_state().name)
+        self.assertIsNone(self.service.next_deadline())
+
+    def test_events_restart_and_cancel_timer(self):
+        self.service.add("gate")
+        self.service.send("gate", "coin")
+        self.clock.now = 20
+        self.service.send("gate", "coin")
+        self.clock.now = 40
+        self.assertEqual([], self.service.poll())
+        self.service.send("gate", "push")
+        self.assertEqual([], self.service.poll(now=100))
+        self.service.send("gate", "coin")
+        self.service.remove("gate")
+        self.assertEqual([], self.service.poll(now=1000))
+        self.assertEqual(0, len(self.service))
+
+    def test_add_instance_in_timed_state(self):
+        self.service.add("gate", self.service.definition.new_instance("unlocked"))
+        self.assertIn("gate", self.service)
+        self.assertEqual([("gate", "expired", "relock")], self.service.poll(now=30))
+
+    def test_failing_handler_fires_whole_batch(self):
+        def handler(key, event, action):
+            self.fired.append(key)
+            if key == "gate-1":
+                raise ValueError(key)
+
+        self.service.handler = handler
+        for key in ("gate-1", "gate-2"):
+            self.service.add(key)
+            self.service.send(key, "coin")
+        with self.assertRaises(ValueError):
+            self.service.poll(now=30)
+        self.assertEqual(["gate-1", "gate-2"], self.fired)
+        self.assertEqual(["locked", "locked"], [self.service.instance(k).get_current_state().name for k in self.fired])
+        self.assertIsNone(self.service.next_deadline())
@@ -0,0 +1,33 @@
+from unittest import TestCase, skipIf
+from pyautomaton.compiled import MISSING
+from pyautomaton.vectorized import BatchStepper, np
+from tests import helpers
+
+
+def turnstile():
+    return helpers.turnstile().coming_from("unlocked").go_in("jammed").when("kick")
+
+
+@skipIf(np is None, "numpy is not installed")
+class BatchStepperTestCase(TestCase):
+    def test_step_matches_automaton(self):
+        stepper = BatchStepper.from_automaton(turnstile())
+        names = ["locked", "locked", "unlocked", "unlocked", "unlocked"]
+        events = ["push", "coin", "coin", "push", "kick"]
+        next_states, action_ids, illegal = stepper.step(stepper.state_ids(names), stepper.event_ids(events))
+        self.assertFalse(illegal.any())
+        for name, event, next_state, action in zip(names, events, next_states, stepper.actions(action_ids)):
+            fsm = turnstile()
+            fsm.set_current_state(name)
+            self.assertEqual(fsm(event), action)
+            self.assertEqual(fsm.get_current_state().name, stepper.table.state_names[next_state])
+
+    def test_illegal_events_are_masked(self):
+        stepper = BatchStepper.from_automaton(turnstile())
+        states = stepper.state_ids(["locked", "jammed", "unlocked"])
+        events = stepper.event_ids(["kick", "push", "kick"])
+        next_states, action_ids, illegal = stepper.step(states, events)
+        self.assertEqual([True, True, False], illegal.tolist())
+        self.assertEqual(states[:2].tolist(), next_states[:2].tolist())
+        self.assertEqual([MISSING, MISSING], action_ids[:2].tolist())
+        self.assertEqual(stepper.table.state_ids["jammed"], next_states[2])